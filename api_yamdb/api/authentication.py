@@ -0,0 +1,169 @@
+"""Аутентификация по JWT без обращения к БД на каждый запрос.
+
+Токен, выданный get_jwt_token, содержит роль, признак суперпользователя
+и версию токенов пользователя. По ним собирается экземпляр User с
+отложенными остальными полями: права проверяются без запроса к БД,
+а поля профиля подгружаются, только если представление к ним обратится.
+Версия токенов сверяется с кэшем, а User.save увеличивает её при смене
+роли или прав суперпользователя, поэтому такие изменения из API,
+админки или команд отзывают выданные ранее токены.
+
+Для токенов без роли пользователь, загруженный из БД, запоминается в
+ограниченном LRU-кэше процесса на AUTH_USER_CACHE_TTL секунд. Записи
+сбрасываются сигналами при изменении и удалении пользователя.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from monitoring.metrics import record_cache_lookup
+from users.models import User
+
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+VERSION_CLAIM = 'ver'
+
+
+def issue_access_token(user):
+    """Выдаёт access-токен с ролью и версией токенов пользователя."""
+    token = AccessToken.for_user(user)
+    token[ROLE_CLAIM] = user.role
+    token[SUPERUSER_CLAIM] = user.is_superuser
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def token_version_key(user_id):
+    return f'auth:token_version:{user_id}'
+
+
+def get_token_version(user_id):
+    """
+    Текущая версия токенов активного пользователя или None,
+    если пользователь удалён или заблокирован.
+    """
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+class UserCache:
+    """Потокобезопасный LRU-кэш пользователей с временем жизни записей."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        """Копия пользователя из кэша или None."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        entry = (time.monotonic() + self.ttl, copy.copy(user))
+        with self.lock:
+            self.entries[user_id] = entry
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+)
+
+
+def forget_user(user_id):
+    """Сбрасывает закэшированные пользователя и версию его токенов."""
+    user_cache.discard(user_id)
+    cache.delete(token_version_key(user_id))
+
+
+def load_full_user(user):
+    """Возвращает пользователя со всеми полями, загружая его при нужде."""
+    if user.get_deferred_fields():
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Загружает пользователя по токену не чаще раза в AUTH_USER_CACHE_TTL."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        user = user_cache.get(user_id)
+        record_cache_lookup('auth_user', user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+
+class RoleClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Собирает пользователя из утверждений токена. Токены без роли,
+    выданные до появления этих утверждений, обрабатываются обычным
+    образом с загрузкой пользователя из БД через кэш.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        version = validated_token.get(VERSION_CLAIM)
+        if get_token_version(user_id) != version:
+            raise AuthenticationFailed(
+                'Токен отозван.', code='token_revoked'
+            )
+        claims = {
+            'id': user_id,
+            'role': validated_token[ROLE_CLAIM],
+            'is_superuser': validated_token.get(SUPERUSER_CLAIM, False),
+            'is_active': True,
+            'token_version': version,
+        }
+        field_names = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(
+            router.db_for_read(User),
+            field_names,
+            [claims[name] for name in field_names]
+        )
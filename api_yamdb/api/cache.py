@@ -0,0 +1,82 @@
+"""Кэширование ответов публичных эндпоинтов каталога.
+
+Ключ ответа строится из пространства имён, его текущей версии,
+версий данных ответа (если они есть), формата ответа, хоста, пути и
+нормализованных параметров запроса.
+Изменение данных увеличивает версию пространства имён, поэтому старые
+ключи просто перестают запрашиваться и вытесняются по таймауту.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from monitoring.metrics import record_cache_lookup
+
+KEY_PREFIX = 'catalog'
+NAMESPACES = ('titles', 'categories', 'genres')
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:version:{namespace}'
+
+
+def get_version(namespace):
+    """Возвращает текущую версию пространства имён."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Начальное значение берём от времени, чтобы после вытеснения
+        # ключа версии не совпали со старыми закэшированными ответами.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*namespaces):
+    """Делает недействительными ответы переданных пространств имён."""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_catalog():
+    """Сбрасывает все закэшированные ответы каталога."""
+    bump_version(*NAMESPACES)
+
+
+def normalize_query(query_params, allowed):
+    """Оставляет только влияющие на ответ параметры в стабильном порядке."""
+    return urlencode([
+        (name, value)
+        for name in sorted(set(query_params) & set(allowed))
+        for value in sorted(query_params.getlist(name))
+    ])
+
+
+def response_cache_key(namespace, request, allowed_params,
+                       data_versions=None):
+    raw = '{versions}|{format}|{host}{path}?{query}'.format(
+        versions=data_versions or '',
+        format=request.accepted_renderer.format,
+        host=request.get_host(),
+        path=request.path,
+        query=normalize_query(request.query_params, allowed_params),
+    )
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{namespace}:{get_version(namespace)}:{digest}'
+
+
+def get_cached_data(key):
+    data = cache.get(key)
+    record_cache_lookup('catalog', data is not None)
+    return data
+
+
+def set_cached_data(key, data):
+    cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
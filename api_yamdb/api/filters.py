@@ -1,6 +1,7 @@
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitlesFilter(filters.FilterSet):
@@ -16,7 +17,11 @@ class TitlesFilter(filters.FilterSet):
         field_name='genre__slug',
         lookup_expr='exact'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'genre', 'category']
+        fields = ['name', 'year', 'genre', 'category', 'search']
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
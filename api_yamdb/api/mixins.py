@@ -1,4 +1,17 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import mixins, status, viewsets
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from reviews.versions import get_versions, versions_tracked
+from .cache import get_cached_data, response_cache_key, set_cached_data
+from .pagination import PubDateCursorPagination
+from .renderers import FastJSONRenderer
 
 
 class ListCreateDestroyViewSet(
@@ -8,3 +21,241 @@ class ListCreateDestroyViewSet(
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class CachedListMixin:
+    """
+    Кэширует данные ответов на чтение списка до изменения
+    моделей, от которых зависит пространство имён cache_namespace.
+    В ключ попадают только параметры из cache_query_params и версии
+    данных из ConditionalGetMixin, если они есть: так закэшированное
+    тело всегда соответствует ETag ответа. Для FastJSONRenderer
+    хранится готовый JSON, который при попадании в кэш выводится без
+    повторного кодирования.
+    """
+    cache_namespace = None
+    cache_query_params = ('page',)
+    data_versions = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = response_cache_key(
+            self.cache_namespace, request, self.cache_query_params,
+            self.data_versions
+        )
+        data = get_cached_data(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            if isinstance(request.accepted_renderer, FastJSONRenderer):
+                response.data = request.accepted_renderer.encode(
+                    response.data
+                )
+            set_cached_data(key, response.data)
+        return response
+
+
+class CachedRetrieveMixin(CachedListMixin):
+    """Дополнительно кэширует ответы на чтение отдельного объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class SelectablePaginationMixin:
+    """
+    Позволяет клиенту выбрать курсорную пагинацию параметром
+    ?pagination=cursor; без него используется пагинация по умолчанию.
+    Вьюсет отключает выбор, задав cursor_pagination_class = None.
+    """
+    cursor_pagination_class = PubDateCursorPagination
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            mode = self.request.query_params.get(self.pagination_query_param)
+            if self.cursor_pagination_class is not None and mode == 'cursor':
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+class StreamingListMixin:
+    """
+    Отдаёт страницы списка от stream_min_items элементов потоком:
+    FastJSONRenderer.iter_render кодирует их частями, и клиент получает
+    начало ответа, не дожидаясь кодирования всей страницы. Заголовки
+    ответа, включая ETag и Cache-Control, сохраняются.
+    """
+    stream_min_items = 100
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if not self.should_stream(request, response):
+            return response
+        renderer = request.accepted_renderer
+        streaming = StreamingHttpResponse(
+            renderer.iter_render(response.data),
+            status=response.status_code,
+            content_type=renderer.media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                streaming[header] = value
+        return streaming
+
+    def should_stream(self, request, response):
+        data = getattr(response, 'data', None)
+        results = data.get('results') if isinstance(data, dict) else None
+        renderer = getattr(request, 'accepted_renderer', None)
+        return (
+            getattr(self, 'action', None) == 'list'
+            and response.status_code == status.HTTP_200_OK
+            and isinstance(renderer, FastJSONRenderer)
+            and renderer.get_indent(request.accepted_media_type, {}) is None
+            and isinstance(results, list)
+            and len(results) >= self.stream_min_items
+        )
+
+
+class NestedParentMixin:
+    """
+    Загружает родительский объект вложенного маршрута один раз за
+    запрос. parent_lookups сопоставляет аргументы URL с полями
+    родителя, так что родитель ищется сразу по всем уровням маршрута.
+    """
+    parent_queryset = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.parent_queryset.all(), **{
+                field: self.kwargs[kwarg]
+                for kwarg, field in self.parent_lookups.items()
+            })
+        return self._parent
+
+
+class SparseQuerysetMixin:
+    """
+    Загружает для чтения только колонки полей, оставшихся в ответе
+    после ?fields= и ?omit= (SparseFieldsMixin сериализатора). Связи из
+    sparse_select_related присоединяются, а many-to-many подгружаются
+    prefetch, только если соответствующие поля есть в ответе.
+    """
+    sparse_select_related = ()
+    # Колонки, нужные независимо от полей ответа: например, внешний ключ
+    # на родителя, иначе Django дозагрузит его для каждой строки.
+    sparse_required_fields = ()
+
+    def sparse_queryset(self, queryset):
+        model = queryset.model
+        columns, select, prefetch = list(self.sparse_required_fields), [], []
+        for name in self.get_serializer().get_model_sources():
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_many:
+                prefetch.append(name)
+                continue
+            columns.append(name)
+            if name in self.sparse_select_related:
+                select.append(name)
+        queryset = queryset.only(*columns).prefetch_related(*prefetch)
+        if select:
+            # select_related() без аргументов присоединил бы все связи.
+            queryset = queryset.select_related(*select)
+        return queryset
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag и Cache-Control к ответам list/retrieve и отвечает
+    304 на совпавший If-None-Match одним запросом к БД, без выборки
+    данных и сериализации. ETag строится из версий наборов данных,
+    из etag_namespaces или get_etag_namespaces (см. reviews.versions),
+    поэтому любое изменение данных ответа меняет и его ETag.
+    """
+    data_versions = None
+    etag_namespaces = None
+
+    def get_etag_namespaces(self):
+        if self.etag_namespaces is None:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} должен задать etag_namespaces '
+                'или переопределить get_etag_namespaces().'
+            )
+        return self.etag_namespaces
+
+    @staticmethod
+    def object_namespaces(prefix, pk):
+        """Набор данных объекта или None, если pk не число."""
+        try:
+            return (f'{prefix}:{int(pk)}',)
+        except ValueError:
+            return None
+
+    def get_etag(self, request):
+        namespaces = self.get_etag_namespaces()
+        if namespaces is None or not versions_tracked():
+            return None
+        self.data_versions = ':'.join(map(str, get_versions(namespaces)))
+        raw = '{versions}|{format}|{path}'.format(
+            versions=self.data_versions,
+            format=request.accepted_renderer.format,
+            path=request.get_full_path(),
+        )
+        return '"{}"'.format(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        header = request.META.get('HTTP_IF_NONE_MATCH', '')
+        client_etags = [
+            value[2:] if value.startswith('W/') else value
+            for value in parse_etags(header)
+        ]
+        if etag in client_etags or '*' in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            self.patch_cache_headers(request, response)
+        return response
+
+    @staticmethod
+    def patch_cache_headers(request, response):
+        """
+        Данные читаются всеми, поэтому ответ анонимному клиенту можно
+        хранить в общих кэшах; ответы с авторизацией — только в личных.
+        Перед использованием копия всегда сверяется с сервером.
+        """
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+        else:
+            patch_cache_control(response, public=True)
+        patch_cache_control(response, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по (pub_date, id): страницы выбираются
+    по ключу без OFFSET и без подсчёта общего числа записей. Для
+    выгрузки длинных лент клиент может запросить страницу побольше
+    параметром ?page_size=.
+    """
+    ordering = ('pub_date', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
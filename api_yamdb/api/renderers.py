@@ -0,0 +1,102 @@
+"""Быстрые JSON-рендерер и парсер API.
+
+FastJSONRenderer выдаёт тот же JSON, что и JSONRenderer из DRF, но
+кодировщик с разделителями создаётся один раз, а готовые фрагменты
+RawJSON (например, ответы из кэша) выводятся без повторного
+кодирования. iter_render отдаёт большие списки частями для потоковых
+ответов.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+from rest_framework.utils.json import strict_constant
+
+
+class RawJSON(str):
+    """Уже закодированный JSON, который рендерер выводит как есть."""
+    __slots__ = ()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер для рабочего окружения. Отступы по запросу
+    (application/json; indent=N) обрабатывает стандартный рендерер.
+    """
+    encoder = encoders.JSONEncoder(
+        ensure_ascii=JSONRenderer.ensure_ascii,
+        allow_nan=not JSONRenderer.strict,
+        separators=(
+            SHORT_SEPARATORS if JSONRenderer.compact else LONG_SEPARATORS
+        ),
+    )
+
+    def encode(self, data):
+        """Кодирует данные в RawJSON, готовые фрагменты не трогает."""
+        if isinstance(data, RawJSON):
+            return data
+        # Как и DRF, экранируем разделители строк, недопустимые в JS.
+        return RawJSON(
+            self.encoder.encode(data)
+            .replace('\u2028', '\\u2028')
+            .replace('\u2029', '\\u2029')
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            if isinstance(data, RawJSON):
+                data = json.loads(data)
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return self.encode(data).encode()
+
+    def iter_render(self, data, chunk_size=100):
+        """
+        Отдаёт JSON частями по chunk_size элементов списка: самого
+        data или его ключа results, как в ответах с пагинацией.
+        """
+        separator = self.encoder.item_separator
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            head = {
+                key: value for key, value in data.items() if key != 'results'
+            }
+            prefix = self.encode(head)[:-1]
+            yield '{prefix}{separator}"results"{colon}'.format(
+                prefix=prefix,
+                separator=separator if head else '',
+                colon=self.encoder.key_separator,
+            ).encode()
+            yield from self.iter_render(data['results'], chunk_size)
+            yield b'}'
+        elif isinstance(data, list):
+            yield b'['
+            for start in range(0, len(data), chunk_size):
+                chunk = self.encode(data[start:start + chunk_size])[1:-1]
+                yield ((separator if start else '') + chunk).encode()
+            yield b']'
+        else:
+            yield self.render(data)
+
+
+class FastJSONParser(JSONParser):
+    """Разбирает тело запроса целиком одним вызовом json.loads."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        parse_constant = strict_constant if self.strict else None
+        try:
+            return json.loads(
+                stream.read().decode(encoding), parse_constant=parse_constant
+            )
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -1,13 +1,54 @@
+from django.db.models import Q
 from rest_framework import serializers
-from rest_framework.exceptions import NotFound, ValidationError
-from rest_framework.generics import get_object_or_404
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.validators import UniqueValidator
 
+from monitoring.timing import TimedSerializerMixin
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+def query_param_list(request, name):
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Оставляет в ответе на чтение только поля из ?fields= или убирает
+    поля из ?omit= (имена через запятую). sparse_field_sources задаёт
+    поля модели, из которых строится поле ответа, если это не его source.
+    """
+    sparse_field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        selected = query_param_list(request, 'fields')
+        omitted = query_param_list(request, 'omit')
+        unknown = (selected | omitted) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            })
+        for name in list(self.fields):
+            if (selected and name not in selected) or name in omitted:
+                self.fields.pop(name)
+
+    def get_model_sources(self):
+        """Имена полей модели, нужных для оставшихся полей ответа."""
+        sources = set()
+        for name, field in self.fields.items():
+            sources.update(
+                self.sparse_field_sources.get(name, (field.source,))
+            )
+        return sources
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сеарилизатор для Usera."""
     username = serializers.RegexField(regex=r'^[\w.@+-]+\Z',
                                       max_length=150,
@@ -38,20 +79,38 @@ class CreateUserSerializer(serializers.Serializer):
         return username
 
     def validate(self, data):
+        """
+        Одним запросом находит пользователей с тем же именем или почтой.
+        Повторная регистрация с теми же данными не считается ошибкой:
+        найденный пользователь запоминается и переиспользуется в create.
+        """
         username = data.get('username')
         email = data.get('email')
-        if (User.objects.filter(username=username).exists()
-                and User.objects.get(username=username).email != email):
+        users = list(
+            User.objects.filter(Q(username=username) | Q(email=email))
+        )
+        if any(
+            user.username == username and user.email != email
+            for user in users
+        ):
             raise serializers.ValidationError(
                 'Пользователь с таким именем уже зарегистрирован'
             )
-        if (User.objects.filter(email=email).exists()
-                and User.objects.get(email=email).username != username):
+        if any(
+            user.email == email and user.username != username
+            for user in users
+        ):
             raise serializers.ValidationError(
                 'Пользователь с такой почтой уже зарегистрирован'
             )
+        self.existing_user = users[0] if users else None
         return data
 
+    def create(self, validated_data):
+        if self.existing_user is not None:
+            return self.existing_user
+        return User.objects.create(**validated_data)
+
 
 class TokenSeializer(serializers.Serializer):
     """Сериализатор для JWT-токена."""
@@ -59,15 +118,17 @@ class TokenSeializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
 
     def validate(self, data):
-        username = data.get('username')
-        if not User.objects.filter(username=username).exists():
+        """Находит пользователя и передаёт его в validated_data['user']."""
+        user = User.objects.filter(username=data.get('username')).first()
+        if user is None:
             raise NotFound(
                 'Пользователь с таким именем не найден.'
             )
+        data['user'] = user
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализует данные запросов
     эндпоинтов r'categories'.
     """
@@ -78,7 +139,7 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализует данные запросов
     эндпоинтов r'genres'.
     """
@@ -89,7 +150,7 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+class TitleCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализует данные запросов
     эндпоинтов r'titles', если
     self.action in ('retrieve', 'list').
@@ -106,7 +167,8 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ReadOnlyTitleSerializer(serializers.ModelSerializer):
+class ReadOnlyTitleSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                              serializers.ModelSerializer):
     """Сериализует данные запросов
     эндпоинтов r'titles', если
     self.action not in ('retrieve', 'list').
@@ -114,6 +176,7 @@ class ReadOnlyTitleSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
+    sparse_field_sources = {'rating': ('score_sum', 'review_count')}
 
     class Meta:
         model = Title
@@ -122,7 +185,8 @@ class ReadOnlyTitleSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                       serializers.ModelSerializer):
     """Сериализует данные запросов
     эндпоинтов r'reviews'.
     """
@@ -135,23 +199,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True, slug_field='username'
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError('Вы не можете добавить более'
-                                      'одного отзыва на произведение')
-        return data
-
     class Meta:
         model = Review
         fields = '__all__'
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                        serializers.ModelSerializer):
     """Сериализует данные запросов
     эндпоинтов r'comments'.
     """
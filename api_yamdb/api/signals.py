@@ -0,0 +1,41 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.signals import data_loaded
+from users.models import User
+from .authentication import forget_user
+from .cache import bump_version, invalidate_catalog
+
+CACHE_DEPENDENCIES = {
+    Category: ('categories', 'titles'),
+    Genre: ('genres', 'titles'),
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+}
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """Сбрасывает кэш ответов, в которых участвует изменённая модель."""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_version(*CACHE_DEPENDENCIES[sender])
+
+
+def invalidate_catalog_after_load(sender, **kwargs):
+    """Массовая загрузка пишет в обход сигналов моделей."""
+    invalidate_catalog()
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+m2m_changed.connect(invalidate_cached_responses, sender=GenreTitle)
+
+data_loaded.connect(invalidate_catalog_after_load)
+
+post_save.connect(forget_cached_user, sender=User)
+post_delete.connect(forget_cached_user, sender=User)
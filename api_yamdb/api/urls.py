@@ -4,7 +4,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     UsersViewSet, send_confirmation_code, get_jwt_token,
     CategoryViewSet, GenreViewSet, TitleViewSet,
-    ReviewViewSet, CommentViewSet
+    ReviewViewSet, CommentViewSet, export_data
 )
 
 router = DefaultRouter()
@@ -24,5 +24,6 @@ router.register(
 urlpatterns = [
     path('v1/auth/token/', get_jwt_token, name='token_obtain'),
     path('v1/auth/signup/', send_confirmation_code, name='sign_up'),
+    path('v1/export/<str:dataset>/', export_data, name='export'),
     path('v1/', include(router.urls)),
 ]
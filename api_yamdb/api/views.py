@@ -1,20 +1,26 @@
-from sqlite3 import IntegrityError
-from django.shortcuts import get_object_or_404
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.settings import api_settings
 
 from users.models import User
-from reviews.models import Category, Genre, Review, Title
+from users.outbox import enqueue_email
+from reviews.datasets import DATASETS, FORMATS, export_lines
+from reviews.models import Category, Comment, Genre, Review, Title
+from .authentication import issue_access_token, load_full_user
 from .filters import TitlesFilter
-from .mixins import ListCreateDestroyViewSet
+from .mixins import (
+    CachedListMixin, CachedRetrieveMixin, ConditionalGetMixin,
+    ListCreateDestroyViewSet, NestedParentMixin, SelectablePaginationMixin,
+    SparseQuerysetMixin, StreamingListMixin
+)
 from .permissions import (
     IsAdminOnly, IsAdminOrReadOnly, IsAuthorAdminModeratorPermission
 )
@@ -35,11 +41,10 @@ def get_jwt_token(request):
     """
     serializer = TokenSeializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = serializer.validated_data.get('username')
+    user = serializer.validated_data['user']
     confirmation_code = serializer.validated_data.get('confirmation_code')
-    user = get_object_or_404(User, username=username)
     if default_token_generator.check_token(user, confirmation_code):
-        token = AccessToken.for_user(user)
+        token = issue_access_token(user)
         return Response(
             {'token': str(token)},
             status=status.HTTP_200_OK)
@@ -59,25 +64,44 @@ def send_confirmation_code(request):
     serializer = CreateUserSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     try:
-        email = serializer.validated_data.get('email')
-        username = serializer.validated_data.get('username')
-        user, _ = User.objects.get_or_create(
-            username=username,
-            email=email,
-        )
+        with transaction.atomic():
+            user = serializer.save()
     except IntegrityError:
         return Response('Попробуйте ввести другие данные',
                         status=status.HTTP_400_BAD_REQUEST)
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue_email(
         subject='Код подтверждения',
         message=f'Код подтверждения: {confirmation_code}',
-        from_email=None,
-        recipient_list=[user.email],
+        recipient=user.email,
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminOnly])
+def export_data(request, dataset):
+    """Потоковая выгрузка набора данных, обработка
+    эндпоинта 'v1/export/<dataset>/'.
+    """
+    if dataset not in DATASETS:
+        raise NotFound(f'Набор данных {dataset} не найден.')
+    output_format = request.query_params.get('output', 'ndjson')
+    if output_format not in FORMATS:
+        raise ValidationError(
+            {'output': f'Допустимые форматы: {", ".join(FORMATS)}.'}
+        )
+    content_type, extension = FORMATS[output_format]
+    response = StreamingHttpResponse(
+        export_lines(DATASETS[dataset], output_format),
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{extension}"'
+    )
+    return response
+
+
 class UsersViewSet(viewsets.ModelViewSet):
     """Вьюсет для User."""
     http_method_names = ['get', 'post', 'patch', 'delete']
@@ -91,7 +115,7 @@ class UsersViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'patch'],
             permission_classes=[IsAuthenticated], url_path='me')
     def me(self, request):
-        user = request.user
+        user = load_full_user(request.user)
         if request.method == 'GET':
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -106,8 +130,10 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(CachedListMixin, ListCreateDestroyViewSet):
     """Обрабатывает запросы к эндпоинтам r'categories'."""
+    cache_namespace = 'categories'
+    cache_query_params = ('page', 'search')
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -116,8 +142,10 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(CachedListMixin, ListCreateDestroyViewSet):
     """Обрабатывает запросы к эндпоинтам r'genres'."""
+    cache_namespace = 'genres'
+    cache_query_params = ('page', 'search')
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -126,51 +154,115 @@ class GenreViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedRetrieveMixin,
+                   SparseQuerysetMixin, viewsets.ModelViewSet):
     """Обрабатывает запросы к эндпоинтам r'titles'."""
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')
-    ).order_by('name')
+    cache_namespace = 'titles'
+    cache_query_params = ('page', 'fields', 'omit', *TitlesFilter.Meta.fields)
+    sparse_select_related = ('category',)
+    queryset = Title.objects.all().order_by('name')
     serializer_class = TitleCreateSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('retrieve', 'list'):
+            return self.sparse_queryset(queryset)
+        return queryset
+
+    def get_etag_namespaces(self):
+        if self.action == 'retrieve':
+            return self.object_namespaces('title', self.kwargs['pk'])
+        return ('titles',)
+
     def get_serializer_class(self):
         if self.action in ('retrieve', 'list'):
             return ReadOnlyTitleSerializer
         return TitleCreateSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(StreamingListMixin, ConditionalGetMixin,
+                    SelectablePaginationMixin, NestedParentMixin,
+                    SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     Обрабатывает запросы к эндпоинтам
     отзывов.
     """
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorAdminModeratorPermission,)
+    parent_queryset = Title.objects.only('id', 'name')
+    parent_lookups = {'title_id': 'pk'}
+    sparse_select_related = ('author',)
+    sparse_required_fields = ('title',)
+
+    def get_etag_namespaces(self):
+        return self.object_namespaces('reviews', self.kwargs['title_id'])
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        if self.action in ('retrieve', 'list'):
+            return self.sparse_queryset(self.get_parent().reviews.all())
+        # Изменение и удаление ищут отзыв сразу по произведению из URL,
+        # без отдельного запроса родителя.
+        reviews = Review.objects.filter(title_id=self.kwargs['title_id'])
+        if self.action == 'destroy':
+            return reviews.only('id', 'author_id', 'title_id', 'score')
+        return reviews.select_related('author', 'title').only(
+            'title', 'text', 'author', 'score', 'pub_date',
+            'title__name', 'author__username'
+        )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        title = self.get_parent()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Повторный отзыв отсекает ограничение unique_review; другие
+            # ошибки целостности не выдаются за ошибку клиента.
+            if not Review.objects.filter(
+                title=title, author_id=self.request.user.id
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы не можете добавить более одного отзыва '
+                    'на произведение'
+                ]
+            })
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(StreamingListMixin, ConditionalGetMixin,
+                     SelectablePaginationMixin, NestedParentMixin,
+                     SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     Обрабатывает запросы к эндпоинтам
     комментариев к отзывам.
     """
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorAdminModeratorPermission,)
+    parent_queryset = Review.objects.only('id', 'title_id')
+    parent_lookups = {'review_id': 'pk', 'title_id': 'title_id'}
+    sparse_select_related = ('author',)
+    sparse_required_fields = ('review',)
+
+    def get_etag_namespaces(self):
+        return self.object_namespaces('comments', self.kwargs['review_id'])
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        if self.action in ('retrieve', 'list'):
+            return self.sparse_queryset(self.get_parent().comments.all())
+        comments = Comment.objects.filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id'],
+        )
+        if self.action == 'destroy':
+            return comments.only('id', 'author_id', 'review_id')
+        return comments.select_related('author').only(
+            'review', 'text', 'author', 'pub_date', 'author__username'
+        )
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+        review = self.get_parent()
         serializer.save(author=self.request.user, review=review)
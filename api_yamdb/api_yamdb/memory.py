@@ -0,0 +1,16 @@
+"""Сведения о памяти процесса для команд и мониторинга."""
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_memory_bytes():
+    """Пиковый объём памяти процесса в байтах или None."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт значение в килобайтах, macOS — в байтах.
+    return usage if sys.platform == 'darwin' else usage * 1024
@@ -27,9 +27,13 @@ INSTALLED_APPS = [
     'api',
     'reviews',
     'users',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.SlowQueryLogMiddleware',
+    'monitoring.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,16 +99,44 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
                                 'PageNumberPagination',
     "PAGE_SIZE": 10,
+    # Браузерный интерфейс API нужен только при разработке.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+# Сколько секунд версия токенов пользователя хранится в кэше. При
+# кэше, общем для всех процессов, отзыв токенов действует сразу,
+# при локальном — в пределах этого времени в остальных процессах.
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+
+# Кэш пользователей, загруженных по токенам без роли: число записей и
+# время жизни записи в секундах. Кэш свой у каждого процесса.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 30
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+CATALOG_CACHE_TIMEOUT = 60 * 5
 
 # Internationalization
 
@@ -134,3 +166,41 @@ AUTH_USER_MODEL = 'users.User'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIl_TOKEN = 'token@yamdb.test'
+
+# Email outbox: 'thread' — фоновый поток в процессе приложения,
+# 'worker' — отдельный процесс manage.py send_emails --loop,
+# 'eager' — отправка сразу в запросе.
+EMAIL_OUTBOX_MODE = 'thread'
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_POLL_INTERVAL = 5
+
+# Заголовок Server-Timing и строка лога monitoring.requests с числом
+# запросов к БД и временем фаз для каждого запроса.
+SERVER_TIMING_ENABLED = False
+
+# Запросы к БД дольше порога в миллисекундах попадают в журнал
+# медленных запросов (админка, «Медленные запросы») вместе с планом
+# EXPLAIN. None выключает журнал.
+SLOW_QUERY_THRESHOLD_MS = None
+
+# Счётчики запросов для эндпоинта /metrics в формате Prometheus.
+# Без токена администратора он доступен только с адресов из
+# METRICS_ALLOWED_IPS или с заголовком X-Metrics-Token, равным
+# METRICS_TOKEN. По умолчанию оба способа выключены: за обратным
+# прокси все запросы приходят с его адреса, обычно 127.0.0.1.
+METRICS_ENABLED = True
+METRICS_ALLOWED_IPS = ()
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'monitoring': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import SlowQuery
+
+
+class AdminSlowQuery(admin.ModelAdmin):
+    """Настройка админки для журнала медленных запросов."""
+    list_display = ('normalized_sql', 'view', 'count', 'total_time',
+                    'max_time', 'last_seen')
+    search_fields = ('normalized_sql', 'view')
+    list_filter = ('view',)
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+
+
+admin.site.register(SlowQuery, AdminSlowQuery)
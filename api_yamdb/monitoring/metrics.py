@@ -0,0 +1,238 @@
+"""Метрики процесса в текстовом формате Prometheus.
+
+Счётчики и гистограммы хранятся в отдельной части реестра для каждого
+потока: запись в неё не требует блокировок, потому что поток пишет
+только в свою часть. Блокировка нужна лишь при первой записи потока и
+при выгрузке, которая суммирует части всех потоков. Части завершённых
+потоков при выгрузке сливаются в общую, поэтому реестр не растёт с
+числом обработанных запросов. Значения относятся к текущему процессу:
+у каждого процесса сервера приложений свои счётчики.
+"""
+import os
+import threading
+import tracemalloc
+from bisect import bisect_left
+
+from api_yamdb.memory import peak_memory_bytes
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'Обработанные HTTP-запросы по маршрутам.'
+    ),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'Время обработки HTTP-запроса по маршрутам.'
+    ),
+    'yamdb_db_queries_total': (
+        'counter', 'Запросы к БД по маршрутам.'
+    ),
+    'yamdb_db_query_duration_seconds_total': (
+        'counter', 'Суммарное время запросов к БД по маршрутам.'
+    ),
+    'yamdb_cache_requests_total': (
+        'counter', 'Обращения к кэшам по результату.'
+    ),
+    'yamdb_cache_hit_ratio': (
+        'gauge', 'Доля попаданий в кэш с запуска процесса.'
+    ),
+    'yamdb_email_outbox_depth': (
+        'gauge', 'Письма в очереди на отправку.'
+    ),
+    'yamdb_email_sent_total': (
+        'counter', 'Письма, отправленные обработчиками этого процесса.'
+    ),
+    'yamdb_email_failed_attempts_total': (
+        'counter', 'Неудачные попытки отправки писем.'
+    ),
+    'process_resident_memory_bytes': (
+        'gauge', 'Текущий объём резидентной памяти процесса.'
+    ),
+    'process_max_resident_memory_bytes': (
+        'gauge', 'Пиковый объём резидентной памяти процесса.'
+    ),
+    'process_traced_memory_bytes': (
+        'gauge', 'Память, выделенная Python, если включён tracemalloc.'
+    ),
+}
+
+
+class _Shard:
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.counters = {}
+        self.histograms = {}
+
+
+class MetricsRegistry:
+    """
+    Счётчики и гистограммы процесса. Метка — кортеж пар (имя, значение)
+    в постоянном порядке.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.retired = _Shard()
+
+    def shard(self):
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = _Shard()
+            with self.lock:
+                self.shards.append(shard)
+            return shard
+
+    def inc(self, name, labels=(), amount=1):
+        counters = self.shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        histograms = self.shard().histograms
+        key = (name, labels)
+        slots = histograms.get(key)
+        if slots is None:
+            # Счётчики корзин, корзина +Inf и сумма значений.
+            slots = histograms[key] = [0] * (len(self.buckets) + 2)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def snapshot(self):
+        """Суммы по всем потокам: (счётчики, гистограммы)."""
+        with self.lock:
+            live = []
+            for shard in self.shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    merge(self.retired, shard.counters, shard.histograms)
+            self.shards = live
+            total = _Shard()
+            merge(total, self.retired.counters, self.retired.histograms)
+        for shard in live:
+            # Копирование словаря атомарно под GIL, даже если поток
+            # в это время пишет в свою часть.
+            merge(total, dict(shard.counters), dict(shard.histograms))
+        return total.counters, total.histograms
+
+
+def merge(target, counters, histograms):
+    for key, value in counters.items():
+        target.counters[key] = target.counters.get(key, 0) + value
+    for key, slots in histograms.items():
+        merged = target.histograms.setdefault(key, [0] * len(slots))
+        for index, value in enumerate(list(slots)):
+            merged[index] += value
+
+
+registry = MetricsRegistry()
+
+
+def record_cache_lookup(cache_name, hit):
+    registry.inc('yamdb_cache_requests_total', (
+        ('cache', cache_name), ('result', 'hit' if hit else 'miss')
+    ))
+
+
+def memory_metrics():
+    """Объём памяти процесса в байтах, насколько его можно узнать."""
+    values = {}
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        values['process_resident_memory_bytes'] = (
+            pages * os.sysconf('SC_PAGE_SIZE')
+        )
+    except (OSError, ValueError, IndexError):
+        pass
+    peak = peak_memory_bytes()
+    if peak is not None:
+        values['process_max_resident_memory_bytes'] = peak
+    if tracemalloc.is_tracing():
+        values['process_traced_memory_bytes'] = (
+            tracemalloc.get_traced_memory()[0]
+        )
+    return values
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def format_number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def hit_ratios(counters):
+    lookups = {}
+    for (name, labels), value in counters.items():
+        if name == 'yamdb_cache_requests_total':
+            labels = dict(labels)
+            hits, total = lookups.get(labels['cache'], (0, 0))
+            lookups[labels['cache']] = (
+                hits + (value if labels['result'] == 'hit' else 0),
+                total + value,
+            )
+    return {
+        (('cache', cache_name),): hits / total
+        for cache_name, (hits, total) in lookups.items() if total
+    }
+
+
+def render_metrics(gauges=None):
+    """
+    Выгружает метрики реестра и переданные значения gauges вида
+    {имя: значение или {метки: значение}} в формате Prometheus.
+    """
+    counters, histograms = registry.snapshot()
+    samples = {}
+    for (name, labels), value in counters.items():
+        samples.setdefault(name, {})[labels] = value
+    samples['yamdb_cache_hit_ratio'] = hit_ratios(counters)
+    for name, value in (gauges or {}).items():
+        samples[name] = value if isinstance(value, dict) else {(): value}
+    for (name, labels), slots in histograms.items():
+        samples.setdefault(name, {})[labels] = slots
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        if not samples.get(name):
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(samples[name].items()):
+            if kind == 'histogram':
+                lines.extend(histogram_lines(name, labels, value))
+            else:
+                lines.append(
+                    f'{name}{format_labels(labels)} {format_number(value)}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+def histogram_lines(name, labels, slots):
+    cumulative = 0
+    bounds = [*map(repr, registry.buckets), '+Inf']
+    for bound, count in zip(bounds, slots):
+        cumulative += count
+        yield (f'{name}_bucket{format_labels((*labels, ("le", bound)))} '
+               f'{cumulative}')
+    yield f'{name}_sum{format_labels(labels)} {format_number(slots[-1])}'
+    yield f'{name}_count{format_labels(labels)} {cumulative}'
@@ -0,0 +1,143 @@
+import json
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import registry
+from .slow_queries import SlowQueryRecorder, save_slow_queries
+from .timing import RequestTimings, current_timings
+
+logger = logging.getLogger('monitoring.requests')
+
+
+def route_name(request):
+    """Имя маршрута из api/urls.py или None, если адрес не распознан."""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else None
+
+
+class MetricsMiddleware:
+    """
+    Считает запросы, время их обработки и запросы к БД по именам
+    маршрутов для эндпоинта /metrics. Включается настройкой
+    METRICS_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timings.record_query)
+                )
+            response = self.get_response(request)
+        route = (('route', route_name(request) or 'unmatched'),)
+        registry.inc('yamdb_http_requests_total', (
+            *route, ('method', request.method),
+            ('status', response.status_code),
+        ))
+        registry.observe(
+            'yamdb_http_request_duration_seconds', route,
+            perf_counter() - started
+        )
+        registry.inc('yamdb_db_queries_total', route, timings.queries)
+        registry.inc(
+            'yamdb_db_query_duration_seconds_total', route, timings.db
+        )
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Считает запросы к БД и их время, время сериализации и рендеринга
+    ответа DRF и отдаёт их в заголовке Server-Timing, а также пишет
+    строку JSON в лог monitoring.requests. Включается настройкой
+    SERVER_TIMING_ENABLED; без неё Django не подключает middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+            f'serialize;dur={timings.serialize * 1000:.2f}',
+            f'render;dur={timings.render * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route_name(request),
+            'status': response.status_code,
+            'queries': timings.queries,
+            'db_ms': round(timings.db * 1000, 2),
+            'serialize_ms': round(timings.serialize * 1000, 2),
+            'render_ms': round(timings.render * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        """Ответы DRF рендерятся сразу после этого метода."""
+        timings = current_timings.get()
+        started = perf_counter()
+
+        def rendered(response):
+            timings.render += perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """
+    Записывает запросы к БД дольше SLOW_QUERY_THRESHOLD_MS миллисекунд
+    в журнал SlowQuery вместе с маршрутом и планом запроса. Без
+    настройки Django не подключает middleware.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    SlowQueryRecorder(
+                        connection.alias, settings.SLOW_QUERY_THRESHOLD_MS,
+                        queries
+                    )
+                ))
+            response = self.get_response(request)
+        if queries:
+            save_slow_queries(queries, route_name(request) or request.path)
+        return response
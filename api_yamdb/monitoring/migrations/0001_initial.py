@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-18 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, unique=True, verbose_name='Отпечаток')),
+                ('normalized_sql', models.TextField(verbose_name='Нормализованный SQL')),
+                ('last_sql', models.TextField(verbose_name='Последний SQL')),
+                ('last_params', models.TextField(blank=True, verbose_name='Параметры последнего запроса')),
+                ('view', models.CharField(blank=True, max_length=255, verbose_name='Маршрут')),
+                ('plan', models.TextField(blank=True, verbose_name='План запроса')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество')),
+                ('total_time', models.FloatField(default=0, verbose_name='Суммарное время, мс')),
+                ('max_time', models.FloatField(default=0, verbose_name='Максимальное время, мс')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='Впервые')),
+                ('last_seen', models.DateTimeField(auto_now=True, verbose_name='Последний раз')),
+            ],
+            options={
+                'verbose_name': 'Медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ('-total_time',),
+            },
+        ),
+    ]
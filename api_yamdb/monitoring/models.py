@@ -0,0 +1,58 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """Медленный запрос к БД, сгруппированный по отпечатку SQL."""
+
+    fingerprint = models.CharField(
+        verbose_name='Отпечаток',
+        max_length=40,
+        unique=True,
+    )
+    normalized_sql = models.TextField(
+        verbose_name='Нормализованный SQL',
+    )
+    last_sql = models.TextField(
+        verbose_name='Последний SQL',
+    )
+    last_params = models.TextField(
+        verbose_name='Параметры последнего запроса',
+        blank=True,
+    )
+    view = models.CharField(
+        verbose_name='Маршрут',
+        max_length=255,
+        blank=True,
+    )
+    plan = models.TextField(
+        verbose_name='План запроса',
+        blank=True,
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Количество',
+        default=0,
+    )
+    total_time = models.FloatField(
+        verbose_name='Суммарное время, мс',
+        default=0,
+    )
+    max_time = models.FloatField(
+        verbose_name='Максимальное время, мс',
+        default=0,
+    )
+    first_seen = models.DateTimeField(
+        verbose_name='Впервые',
+        auto_now_add=True,
+    )
+    last_seen = models.DateTimeField(
+        verbose_name='Последний раз',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'Медленный запрос'
+        verbose_name_plural = 'Медленные запросы'
+        ordering = ('-total_time',)
+
+    def __str__(self):
+        return self.normalized_sql[:80]
@@ -0,0 +1,142 @@
+"""Журнал медленных запросов к БД.
+
+Во время запроса обёртка execute_wrapper только замеряет время и
+складывает в буфер запросы дольше SLOW_QUERY_THRESHOLD_MS. После ответа
+буфер группируется по отпечатку нормализованного SQL, для каждого
+отпечатка один раз выполняется EXPLAIN, и счётчики таблицы SlowQuery
+увеличиваются. Эти запросы выполняются уже без обёртки, поэтому журнал
+не записывает сам себя.
+"""
+import hashlib
+import logging
+import re
+from collections import namedtuple
+from time import perf_counter
+
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SlowQuery
+
+logger = logging.getLogger('monitoring.slow_queries')
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%s|\?')
+IN_LIST_RE = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+SPACES_RE = re.compile(r'\s+')
+EXPLAINABLE = ('SELECT', 'WITH')
+
+ExecutedQuery = namedtuple(
+    'ExecutedQuery', ('alias', 'sql', 'params', 'many', 'duration')
+)
+
+
+def normalize_sql(sql):
+    """
+    Заменяет литералы и параметры на ?, а списки IN любой длины на
+    IN (...), чтобы запросы, отличающиеся только значениями, совпадали.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = SPACES_RE.sub(' ', sql).strip()
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def explain(query):
+    """План запроса; для запросов, кроме SELECT, план не строится."""
+    if query.many or not query.sql.lstrip().upper().startswith(EXPLAINABLE):
+        return ''
+    connection = connections[query.alias]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {query.sql}', query.params)
+            # В SQLite описание шага — последняя колонка строки плана.
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'Не удалось получить план: {error}'
+
+
+class SlowQueryRecorder:
+    """Буфер медленных запросов одного HTTP-запроса."""
+
+    def __init__(self, alias, threshold, queries):
+        self.alias = alias
+        self.threshold = threshold
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (perf_counter() - started) * 1000
+            if duration >= self.threshold:
+                self.queries.append(ExecutedQuery(
+                    self.alias, sql, params, many, duration
+                ))
+
+
+def save_slow_queries(queries, view):
+    """
+    Группирует медленные запросы по отпечатку и обновляет журнал.
+    Ошибка записи не должна ломать уже готовый ответ.
+    """
+    try:
+        write_groups(queries, view)
+    except DatabaseError:
+        logger.exception('Не удалось записать медленные запросы')
+
+
+def write_groups(queries, view):
+    groups = {}
+    for query in queries:
+        normalized = normalize_sql(query.sql)
+        groups.setdefault(normalized, []).append(query)
+    for normalized, group in groups.items():
+        last = group[-1]
+        durations = [query.duration for query in group]
+        plan = explain(last)
+        logger.warning(
+            '%d медленных запросов (до %.1f мс) в %s: %s\n%s',
+            len(group), max(durations), view, normalized, plan
+        )
+        record(
+            fingerprint(normalized), normalized, last, view, plan,
+            len(group), sum(durations), max(durations)
+        )
+
+
+def record(key, normalized, last, view, plan, count, total, longest):
+    values = {
+        'last_sql': last.sql,
+        'last_params': repr(last.params),
+        'view': view[:255],
+        'plan': plan,
+        'last_seen': timezone.now(),
+    }
+    entries = SlowQuery.objects.filter(fingerprint=key)
+    increments = {
+        'count': F('count') + count,
+        'total_time': F('total_time') + total,
+        'max_time': Greatest('max_time', longest),
+    }
+    if entries.update(**values, **increments):
+        return
+    try:
+        with transaction.atomic():
+            SlowQuery.objects.create(
+                fingerprint=key, normalized_sql=normalized, count=count,
+                total_time=total, max_time=longest, **values
+            )
+    except IntegrityError:
+        # Запись успел создать параллельный запрос.
+        entries.update(**values, **increments)
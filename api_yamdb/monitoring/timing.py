@@ -0,0 +1,51 @@
+"""Замеры фаз обработки текущего запроса.
+
+Замеры хранятся в ContextVar, поэтому запросы, обрабатываемые
+параллельно в разных потоках, не смешиваются. Вне запроса или при
+выключенном ServerTimingMiddleware current_timings пуст и замеры
+сводятся к одной проверке.
+"""
+from contextvars import ContextVar
+from time import perf_counter
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Число запросов к БД и время фаз запроса в секундах."""
+    __slots__ = ('queries', 'db', 'serialize', 'render', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.serializing = False
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += perf_counter() - started
+
+
+class TimedSerializerMixin:
+    """
+    Учитывает время to_representation в фазе serialize. Вложенные
+    сериализаторы входят во время внешнего и отдельно не считаются.
+    """
+
+    def to_representation(self, instance):
+        timings = current_timings.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        started = perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializing = False
+            timings.serialize += perf_counter() - started
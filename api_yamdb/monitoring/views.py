@@ -0,0 +1,58 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404
+from rest_framework import permissions, renderers
+from rest_framework.decorators import (api_view, permission_classes,
+                                       renderer_classes)
+from rest_framework.response import Response
+
+from users.outbox import outbox_metrics
+from .metrics import memory_metrics, render_metrics
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class IsAdminOrMetricsScraper(permissions.BasePermission):
+    """
+    Разрешение для админа, запросов с адресов METRICS_ALLOWED_IPS и
+    запросов с заголовком X-Metrics-Token, равным METRICS_TOKEN.
+    """
+    def has_permission(self, request, view):
+        token = request.META.get('HTTP_X_METRICS_TOKEN', '')
+        return (
+            request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+            or bool(settings.METRICS_TOKEN) and hmac.compare_digest(
+                token.encode(), settings.METRICS_TOKEN.encode()
+            )
+            or request.user.is_authenticated and request.user.is_admin
+        )
+
+
+class PrometheusRenderer(renderers.BaseRenderer):
+    """Текст метрик как есть; ошибки — одной строкой detail."""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = f'{data.get("detail", data)}\n'
+        return data.encode(self.charset)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminOrMetricsScraper])
+@renderer_classes([PrometheusRenderer])
+def metrics(request):
+    """Метрики текущего процесса в текстовом формате Prometheus."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    outbox = outbox_metrics()
+    gauges = {
+        'yamdb_email_outbox_depth': outbox['queue_depth'],
+        'yamdb_email_sent_total': outbox['sent'],
+        'yamdb_email_failed_attempts_total': outbox['failed_attempts'],
+        **memory_metrics(),
+    }
+    return Response(render_metrics(gauges), content_type=CONTENT_TYPE)
@@ -0,0 +1,99 @@
+"""Проверка и приведение типов строк csv файлов перед импортом.
+
+Модуль не зависит от Django: его функции выполняются в дочерних
+процессах пула, где проект может быть не настроен. Правила для
+каждого файла строит команда import по полям модели.
+"""
+import re
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+
+SLUG_RE = re.compile(r'^[-a-zA-Z0-9_]+\Z')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+\Z')
+
+
+class Rule(NamedTuple):
+    """Правило проверки одной колонки."""
+    column: str
+    kind: str = 'text'
+    required: bool = False
+    nullable: bool = False
+    min_value: Optional[int] = None
+    max_value: Optional[int] = None
+    max_length: Optional[int] = None
+    choices: Tuple[str, ...] = ()
+
+
+def convert_int(rule, value):
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'«{value}» не является целым числом')
+    if rule.min_value is not None and value < rule.min_value:
+        raise ValueError(f'{value} меньше {rule.min_value}')
+    if rule.max_value is not None and value > rule.max_value:
+        raise ValueError(f'{value} больше {rule.max_value}')
+    return value
+
+
+def convert_datetime(rule, value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'«{value}» не является датой ISO 8601')
+
+
+def convert_text(rule, value):
+    if rule.max_length is not None and len(value) > rule.max_length:
+        raise ValueError(f'длиннее {rule.max_length} символов')
+    if rule.kind == 'slug' and not SLUG_RE.match(value):
+        raise ValueError(f'«{value}» не соответствует формату slug')
+    if rule.kind == 'email' and not EMAIL_RE.match(value):
+        raise ValueError(f'«{value}» не является адресом почты')
+    if rule.choices and value not in rule.choices:
+        raise ValueError(
+            f'«{value}» не входит в {", ".join(rule.choices)}'
+        )
+    return value
+
+
+CONVERTERS = {
+    'int': convert_int,
+    'datetime': convert_datetime,
+}
+
+
+def convert(rule, value):
+    """Возвращает значение нужного типа или бросает ValueError."""
+    return CONVERTERS.get(rule.kind, convert_text)(rule, value)
+
+
+def validate_batch(rules, rows):
+    """
+    Проверяет пачку строк вида (номер строки, словарь значений).
+    Возвращает корректные строки с приведёнными значениями и
+    список ошибок вида (номер строки, описание).
+    """
+    valid, errors = [], []
+    for line_num, row in rows:
+        problems = []
+        if row.pop(None, None) is not None:
+            problems.append('в строке больше значений, чем колонок')
+        for rule in rules:
+            value = row.get(rule.column)
+            if value is None or value == '':
+                if rule.required:
+                    problems.append(f'{rule.column}: обязательное поле')
+                elif rule.nullable:
+                    # Выгрузка пишет NULL пустой строкой.
+                    row[rule.column] = None
+                continue
+            try:
+                row[rule.column] = convert(rule, value)
+            except ValueError as error:
+                problems.append(f'{rule.column}: {error}')
+        if problems:
+            errors.append((line_num, '; '.join(problems)))
+        else:
+            valid.append((line_num, row))
+    return valid, errors
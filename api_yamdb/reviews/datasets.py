@@ -0,0 +1,120 @@
+"""Состав и формат файлов с данными, общий для команд import, export и seed."""
+import csv
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import NamedTuple, Tuple
+
+from users.models import User
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Dataset(NamedTuple):
+    model: type
+    filename: str
+    columns: Tuple[str, ...]
+
+
+# Порядок важен: импорт загружает файлы так, чтобы связанные
+# объекты уже существовали.
+DATASETS = {
+    'users': Dataset(User, 'users.csv', (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    )),
+    'categories': Dataset(Category, 'category.csv', ('id', 'name', 'slug')),
+    'genres': Dataset(Genre, 'genre.csv', ('id', 'name', 'slug')),
+    'titles': Dataset(Title, 'titles.csv', (
+        'id', 'name', 'year', 'category_id', 'description'
+    )),
+    'reviews': Dataset(Review, 'review.csv', (
+        'id', 'title_id', 'text', 'author_id', 'score', 'pub_date'
+    )),
+    'comments': Dataset(Comment, 'comments.csv', (
+        'id', 'review_id', 'text', 'author_id', 'pub_date'
+    )),
+    'genre_titles': Dataset(GenreTitle, 'genre_title.csv', (
+        'id', 'title_id', 'genre_id'
+    )),
+}
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def batches(iterable, size):
+    """Разбивает поток строк на списки не длиннее size."""
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+@contextmanager
+def keep_file_dates(model, columns):
+    """
+    Отключает auto_now_add у полей, значения которых есть в файле,
+    чтобы при загрузке сохранялись исходные даты публикации.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in columns
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+def iter_rows(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Читает таблицу частями, не загружая её в память целиком."""
+    return dataset.model.objects.order_by('pk').values_list(
+        *dataset.columns
+    ).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """Псевдофайл, возвращающий записанную строку вместо её хранения."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(dataset.columns)
+    for row in iter_rows(dataset, chunk_size):
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def ndjson_lines(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    for row in iter_rows(dataset, chunk_size):
+        yield json.dumps(
+            {
+                column: (None if value is None else format_value(value))
+                for column, value in zip(dataset.columns, row)
+            },
+            ensure_ascii=False
+        ) + '\n'
+
+
+def export_lines(dataset, output_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Отдаёт строки выгрузки набора данных в формате csv или ndjson."""
+    if output_format == 'csv':
+        return csv_lines(dataset, chunk_size)
+    return ndjson_lines(dataset, chunk_size)
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.datasets import (DATASETS, DEFAULT_CHUNK_SIZE, FORMATS,
+                              export_lines)
+
+
+class Command(BaseCommand):
+    help = ('Потоковая выгрузка данных из БД в csv или ndjson; '
+            'csv файлы совместимы с командой import')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets', nargs='*',
+            help='Наборы данных для выгрузки, по умолчанию все: '
+                 + ', '.join(DATASETS)
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv',
+            help='Формат выгрузки'
+        )
+        parser.add_argument(
+            '--output-dir', type=Path, default=None,
+            help='Каталог для файлов; без него данные выводятся в stdout'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из БД за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        names = options['datasets'] or list(DATASETS)
+        unknown = set(names) - set(DATASETS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные наборы данных: {", ".join(sorted(unknown))}'
+            )
+        output_dir = options['output_dir']
+        if output_dir is None and len(names) > 1:
+            raise CommandError(
+                'Для выгрузки нескольких наборов укажите --output-dir'
+            )
+        for name in names:
+            dataset = DATASETS[name]
+            lines = export_lines(
+                dataset, options['format'], options['chunk_size']
+            )
+            if output_dir is None:
+                for line in lines:
+                    self.stdout.write(line, ending='')
+                continue
+            output_dir.mkdir(parents=True, exist_ok=True)
+            path = output_dir / Path(dataset.filename).with_suffix(
+                '.' + FORMATS[options['format']][1]
+            )
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                file.writelines(lines)
+            self.stdout.write(self.style.SUCCESS(f'{name}: {path}'))
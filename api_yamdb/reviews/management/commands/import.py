@@ -1,32 +1,412 @@
+import argparse
 import csv
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError, call_command
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError, connections, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
-                            Title, User)
+from api_yamdb.memory import peak_memory_bytes
+from reviews.csv_validation import Rule, validate_batch
+from reviews.datasets import DATASETS, batches, keep_file_dates
+from reviews.signals import data_loaded
 
 MODELS_CSV = {
-    User: 'users.csv',
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    Title: 'titles.csv',
-    Review: 'review.csv',
-    Comment: 'comments.csv',
-    GenreTitle: 'genre_title.csv'
+    dataset.model: dataset.filename for dataset in DATASETS.values()
 }
+DEFAULT_BATCH_SIZE = 1000
+REPORTED_ERRORS_PER_FILE = 20
+
+
+def import_stages():
+    """
+    Группирует файлы по глубине зависимостей моделей: файлы одного
+    этапа не ссылаются друг на друга и могут разбираться одновременно.
+    """
+    levels = {}
+    for model in MODELS_CSV:
+        dependencies = [
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in MODELS_CSV
+        ]
+        levels[model] = max(
+            (levels[dependency] + 1 for dependency in dependencies),
+            default=0
+        )
+    return [
+        [model for model in MODELS_CSV if levels[model] == level]
+        for level in sorted(set(levels.values()))
+    ]
+
+
+def build_rules(model, columns):
+    """Строит правила проверки колонок файла по полям модели."""
+    rules = []
+    for field in model._meta.concrete_fields:
+        column = next(
+            (name for name in (field.attname, field.name) if name in columns),
+            None
+        )
+        if column is None:
+            continue
+        if field.is_relation or isinstance(field, models.IntegerField):
+            kind = 'int'
+        elif isinstance(field, models.SlugField):
+            kind = 'slug'
+        elif isinstance(field, models.EmailField):
+            kind = 'email'
+        elif isinstance(field, models.DateTimeField):
+            kind = 'datetime'
+        else:
+            kind = 'text'
+        limits = {
+            type(validator): validator.limit_value
+            for validator in field.validators
+            if isinstance(validator, (MinValueValidator, MaxValueValidator))
+        }
+        rules.append(Rule(
+            column=column,
+            kind=kind,
+            required=not (field.blank or field.null),
+            nullable=field.null and not field.is_relation,
+            min_value=limits.get(MinValueValidator),
+            max_value=limits.get(MaxValueValidator),
+            max_length=field.max_length if kind != 'int' else None,
+            choices=tuple(str(value) for value, _ in field.choices or ()),
+        ))
+    return rules
+
+
+class BatchStream:
+    """
+    Читает csv файл пачками и отдаёт их проверенными в исходном
+    порядке. С пулом процессов заранее отправляет на проверку до
+    window пачек, поэтому файлы одного этапа разбираются параллельно,
+    пока единственный писатель загружает предыдущий файл.
+    """
+
+    def __init__(self, model, path, batch_size, executor=None, window=2):
+        self.file = open(path, encoding='utf-8', newline='')
+        reader = csv.DictReader(self.file)
+        self.columns = reader.fieldnames or ()
+        self.rules = build_rules(model, self.columns)
+        self.raw_batches = batches(
+            ((reader.line_num, row) for row in reader), batch_size
+        )
+        self.executor = executor
+        self.pending = deque()
+        if executor is not None:
+            for _ in range(window):
+                self.submit()
+
+    def submit(self):
+        batch = next(self.raw_batches, None)
+        if batch is not None:
+            self.pending.append(
+                self.executor.submit(validate_batch, self.rules, batch)
+            )
+
+    def __iter__(self):
+        if self.executor is None:
+            for batch in self.raw_batches:
+                yield validate_batch(self.rules, batch)
+            return
+        while self.pending:
+            future = self.pending.popleft()
+            self.submit()
+            yield future.result()
+
+    def close(self):
+        self.file.close()
+
+
+def aware(value):
+    """Считает даты без часового пояса заданными в UTC."""
+    if (isinstance(value, datetime) and settings.USE_TZ
+            and timezone.is_naive(value)):
+        return timezone.make_aware(value, timezone.utc)
+    return value
+
+
+def parse_since(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise argparse.ArgumentTypeError(
+                f'Некорректная дата: {value}'
+            )
+        moment = datetime.combine(day, datetime.min.time())
+    return aware(moment)
+
+
+def is_older(model, row, since):
+    """Проверяет, опубликована ли запись раньше момента since."""
+    if 'pub_date' not in row:
+        return False
+    field = model._meta.get_field('pub_date')
+    pub_date = aware(field.to_python(row['pub_date']))
+    return pub_date is not None and pub_date < since
+
+
+def differs(model_field, incoming, existing):
+    value = getattr(incoming, model_field.attname)
+    return aware(model_field.to_python(value)) != getattr(
+        existing, model_field.attname
+    )
+
+
+class ForeignKeyResolver:
+    """
+    Приводит идентификаторы связанных объектов к int и проверяет,
+    что такие объекты уже есть в БД. Существующие ключи запрашиваются
+    отдельно для каждой пачки и только среди упомянутых в ней, поэтому
+    память не зависит от размера связанных таблиц.
+    """
+
+    def __init__(self):
+        self.known_ids = {}
+
+    @staticmethod
+    def relations(model):
+        return [
+            field for field in model._meta.concrete_fields
+            if field.is_relation
+        ]
+
+    def load(self, model, batch):
+        """Одним запросом на внешний ключ находит объекты пачки."""
+        self.known_ids = {}
+        for field in self.relations(model):
+            ids = set()
+            for _, row in batch:
+                try:
+                    ids.add(int(row.get(field.name, row.get(field.attname))))
+                except (TypeError, ValueError):
+                    continue
+            objects = field.related_model.objects
+            # SQLite ограничивает число параметров в одном запросе.
+            limit = connections[objects.db].features.max_query_params
+            known = self.known_ids[field.attname] = set()
+            for chunk in batches(sorted(ids), limit or len(ids) or 1):
+                known.update(
+                    objects.filter(pk__in=chunk).values_list('pk', flat=True)
+                )
+
+    def resolve(self, model, row):
+        for field in self.relations(model):
+            value = row.pop(field.name, row.get(field.attname))
+            if value in (None, ''):
+                row[field.attname] = None
+                continue
+            pk = int(value)
+            if pk not in self.known_ids[field.attname]:
+                raise LookupError(
+                    f'{field.attname}={value}: связанный объект не найден'
+                )
+            row[field.attname] = pk
+        return row
 
 
 class Command(BaseCommand):
     help = 'Импорт данных из csv файлов в БД'
 
-    def handle(self, *args, **kwargs):
-        for model, base in MODELS_CSV.items():
-            with open(
-                f'{settings.BASE_DIR}/static/data/{base}',
-                'r', encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(model(**data) for data in reader)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', default=Path(settings.BASE_DIR) / 'static' / 'data',
+            type=Path, help='Каталог с csv файлами'
+        )
+        parser.add_argument(
+            '--batch-size', default=DEFAULT_BATCH_SIZE, type=int,
+            help='Количество строк в одной вставке'
+        )
+        parser.add_argument(
+            '--upsert', action='store_true',
+            help='Обновлять существующие записи по первичному ключу, '
+                 'записывая только изменившиеся строки'
+        )
+        parser.add_argument(
+            '--since', type=parse_since, default=None,
+            help='Пропускать отзывы и комментарии, опубликованные раньше '
+                 'указанного момента (ISO 8601)'
+        )
+        parser.add_argument(
+            '--workers', default=1, type=int,
+            help='Количество процессов для разбора и проверки файлов'
+        )
+        parser.add_argument(
+            '--error-report', type=Path, default=None,
+            help='Файл csv, в который записываются все ошибочные строки'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        if options['workers'] < 1:
+            raise CommandError('--workers должен быть больше нуля')
+        paths = self.find_files(options['data_dir'])
+        executor = self.start_workers(options['workers'])
+        report = self.open_report(options['error_report'])
+        resolver = ForeignKeyResolver()
+        total_errors = 0
+        try:
+            for stage in import_stages():
+                streams = {
+                    model: BatchStream(
+                        model, paths[model], options['batch_size'],
+                        executor, window=options['workers']
+                    )
+                    for model in stage
+                }
+                try:
+                    for model, stream in streams.items():
+                        total_errors += self.import_file(
+                            model, stream, options, resolver
+                        )
+                finally:
+                    for stream in streams.values():
+                        stream.close()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if report is not None:
+                report.close()
+
+        peak = peak_memory_bytes()
+        if peak is not None:
+            self.stdout.write(
+                f'Пиковое потребление памяти: {peak / 2 ** 20:.1f} МБ'
+            )
+        call_command('recalculate_ratings', stdout=self.stdout)
+        data_loaded.send(sender=self.__class__)
+        if total_errors:
+            self.stdout.write(self.style.WARNING(
+                f'Данные загружены, пропущено строк с ошибками: '
+                f'{total_errors}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Данные успешно загружены'))
+
+    @staticmethod
+    def find_files(data_dir):
+        paths = {model: data_dir / base for model, base in MODELS_CSV.items()}
+        for path in paths.values():
+            if not path.is_file():
+                raise CommandError(f'Файл {path} не найден')
+        return paths
+
+    @staticmethod
+    def start_workers(workers):
+        if workers < 2:
+            return None
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=workers)
+
+    def open_report(self, path):
+        self.report_writer = None
+        if path is None:
+            return None
+        report = open(path, 'w', encoding='utf-8', newline='')
+        self.report_writer = csv.writer(report)
+        self.report_writer.writerow(('file', 'line', 'error'))
+        return report
+
+    def import_file(self, model, stream, options, resolver):
+        base = MODELS_CSV[model]
+        stats = Counter()
+        errors = []
+        since = options['since']
+        update_fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key and field.attname in stream.columns
+        ]
+        started = time.monotonic()
+        with transaction.atomic(), keep_file_dates(model, stream.columns):
+            for batch, batch_errors in stream:
+                errors.extend(batch_errors)
+                objects = []
+                resolver.load(model, batch)
+                for line_num, row in batch:
+                    try:
+                        row = resolver.resolve(model, row)
+                        if since and is_older(model, row, since):
+                            stats['пропущено'] += 1
+                            continue
+                        obj = model(**row)
+                        obj.pk = model._meta.pk.to_python(obj.pk)
+                        objects.append(obj)
+                    except (LookupError, TypeError, ValueError) as error:
+                        errors.append((line_num, str(error)))
+                try:
+                    if options['upsert']:
+                        self.upsert(model, objects, update_fields, stats)
+                    else:
+                        model.objects.bulk_create(objects)
+                        stats['создано'] += len(objects)
+                except IntegrityError as error:
+                    hint = '' if options['upsert'] else (
+                        '. Для повторной загрузки используйте --upsert'
+                    )
+                    raise CommandError(f'{base}: {error}{hint}')
+                errors = self.report_errors(base, errors, stats)
+
+        elapsed = time.monotonic() - started
+        count = sum(stats.values())
+        details = ', '.join(
+            f'{name}: {value}' for name, value in sorted(stats.items())
+        )
+        self.stdout.write(
+            f'{base}: {count} строк за {elapsed:.2f} с '
+            f'({count / elapsed if elapsed else count:.0f} строк/с)'
+            + (f'; {details}' if details else '')
+        )
+        if stats['ошибок'] > REPORTED_ERRORS_PER_FILE:
+            self.stderr.write(
+                f'{base}: ещё ошибок — '
+                f'{stats["ошибок"] - REPORTED_ERRORS_PER_FILE}'
+            )
+        return stats['ошибок']
+
+    def report_errors(self, base, errors, stats):
+        """
+        Печатает первые ошибки файла и пишет все ошибки в отчёт.
+        Возвращает пустой список для следующей пачки.
+        """
+        for line_num, message in errors:
+            stats['ошибок'] += 1
+            if stats['ошибок'] <= REPORTED_ERRORS_PER_FILE:
+                self.stderr.write(f'{base}, строка {line_num}: {message}')
+            if self.report_writer is not None:
+                self.report_writer.writerow((base, line_num, message))
+        return []
 
-        self.stdout.write(self.style.SUCCESS('Данные успешно загружены'))
+    @staticmethod
+    def upsert(model, objects, fields, stats):
+        """
+        Вставляет новые записи и обновляет только те существующие,
+        у которых отличается хотя бы одно поле из файла.
+        """
+        existing = model.objects.in_bulk([obj.pk for obj in objects])
+        created = [obj for obj in objects if obj.pk not in existing]
+        changed = [
+            obj for obj in objects
+            if obj.pk in existing and any(
+                differs(field, obj, existing[obj.pk]) for field in fields
+            )
+        ]
+        model.objects.bulk_create(created)
+        if changed and fields:
+            model.objects.bulk_update(
+                changed, [field.name for field in fields]
+            )
+        stats['создано'] += len(created)
+        stats['обновлено'] += len(changed)
+        stats['без изменений'] += len(objects) - len(created) - len(changed)
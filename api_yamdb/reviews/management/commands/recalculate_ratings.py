@@ -0,0 +1,62 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from reviews.models import Title
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Пересчёт суммы оценок и количества отзывов произведений '
+            'с выводом найденных расхождений')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения, не сохраняя изменений'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.annotate(
+            actual_sum=Sum('reviews__score'),
+            actual_count=Count('reviews')
+        ).only('id', 'name', 'score_sum', 'review_count')
+        drifted = []
+        total = 0
+        for title in titles.iterator(chunk_size=BATCH_SIZE):
+            actual_sum = title.actual_sum or 0
+            if (title.score_sum, title.review_count) == (
+                    actual_sum, title.actual_count):
+                continue
+            self.stdout.write(
+                f'{title.pk} «{title.name}»: '
+                f'сумма {title.score_sum} -> {actual_sum}, '
+                f'отзывов {title.review_count} -> {title.actual_count}'
+            )
+            title.score_sum = actual_sum
+            title.review_count = title.actual_count
+            drifted.append(title)
+            total += 1
+            if len(drifted) >= BATCH_SIZE:
+                self.save(drifted, options['dry_run'])
+                drifted = []
+        self.save(drifted, options['dry_run'])
+
+        if not total:
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Найдено расхождений: {total}, изменения не сохранены'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Исправлено расхождений: {total}'
+            ))
+
+    @staticmethod
+    def save(titles, dry_run):
+        if dry_run or not titles:
+            return
+        with transaction.atomic():
+            Title.objects.bulk_update(titles, ['score_sum', 'review_count'])
@@ -0,0 +1,225 @@
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.datasets import keep_file_dates
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.signals import data_loaded
+from users.models import User
+
+# Порядок вставки: связанные объекты записываются раньше ссылающихся.
+MODELS = (User, Category, Genre, Title, GenreTitle, Review, Comment)
+DATES_SPAN = timedelta(days=5 * 365)
+
+
+def next_pk(model):
+    return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+
+def zipf_counts(total, size, exponent, limit, rng):
+    """
+    Распределяет total объектов между size получателями по закону Ципфа
+    (доля получателя с рангом r пропорциональна 1 / r ** exponent),
+    не больше limit на получателя: излишек достаётся остальным
+    пропорционально их весам. Ранги перемешаны.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    counts = [0] * size
+    active = list(range(size))
+    remaining = min(total, size * limit)
+    while remaining and active:
+        norm = sum(weights[index] for index in active)
+        share = remaining
+        for index in active:
+            extra = min(
+                limit - counts[index], remaining,
+                round(share * weights[index] / norm)
+            )
+            counts[index] += extra
+            remaining -= extra
+        if share == remaining:
+            # Остаток меньше, чем округляется до единицы на получателя.
+            for index in active[:remaining]:
+                counts[index] += 1
+            break
+        active = [index for index in active if counts[index] < limit]
+    rng.shuffle(counts)
+    return counts
+
+
+def geometric(rng, mean):
+    """Случайное целое >= 0 с геометрическим распределением и средним mean."""
+    if mean <= 0:
+        return 0
+    return int(math.log(1 - rng.random()) / math.log(mean / (1 + mean)))
+
+
+class BulkWriter:
+    """
+    Копит объекты и записывает их bulk_create пачками. При переполнении
+    любого буфера сбрасываются все, в порядке MODELS, чтобы внешние
+    ключи всегда указывали на уже записанные строки.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.buffers = {model: [] for model in MODELS}
+        self.written = dict.fromkeys(MODELS, 0)
+
+    def add(self, obj):
+        buffer = self.buffers[type(obj)]
+        buffer.append(obj)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model, buffer in self.buffers.items():
+            if buffer:
+                model.objects.bulk_create(buffer, batch_size=self.batch_size)
+                self.written[model] += len(buffer)
+                buffer.clear()
+
+
+class Command(BaseCommand):
+    help = ('Генерация синтетических данных для нагрузочного тестирования: '
+            'число отзывов на произведение распределено по закону Ципфа')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument(
+            '--reviews', type=int, default=200000,
+            help='Общее число отзывов; у одного произведения не больше '
+                 'одного отзыва каждого пользователя'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=400000,
+            help='Примерное общее число комментариев'
+        )
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения отзывов по произведениям'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные'
+        )
+
+    def handle(self, *args, **options):
+        for option in ('users', 'titles', 'categories', 'genres',
+                       'batch_size'):
+            if options[option] < 1:
+                raise CommandError(
+                    f'--{option.replace("_", "-")} должен быть больше нуля'
+                )
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        started = time.monotonic()
+        writer = BulkWriter(options['batch_size'])
+        with transaction.atomic(), keep_file_dates(
+                Review, ['pub_date']), keep_file_dates(Comment, ['pub_date']):
+            users = self.seed_users(writer, options['users'])
+            categories = self.seed_named(
+                writer, Category, options['categories'], 'Категория'
+            )
+            genres = self.seed_named(
+                writer, Genre, options['genres'], 'Жанр'
+            )
+            self.seed_titles(writer, options, users, categories, genres)
+            writer.flush()
+        data_loaded.send(sender=self.__class__)
+        for model, count in writer.written.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.monotonic() - started:.1f} с'
+        ))
+
+    def random_date(self, after=None):
+        start = after or self.now - DATES_SPAN
+        span = (self.now - start).total_seconds()
+        return start + timedelta(seconds=self.rng.uniform(0, span))
+
+    def seed_users(self, writer, count):
+        first = next_pk(User)
+        for pk in range(first, first + count):
+            writer.add(User(
+                pk=pk,
+                username=f'seed_user{pk}',
+                email=f'seed_user{pk}@yamdb.fake',
+                password='!',
+                role=(
+                    User.MODERATOR if self.rng.random() < 0.01 else User.USER
+                ),
+            ))
+        return range(first, first + count)
+
+    def seed_named(self, writer, model, count, label):
+        first = next_pk(model)
+        prefix = model._meta.model_name
+        for pk in range(first, first + count):
+            writer.add(model(
+                pk=pk, name=f'{label} {pk}', slug=f'seed-{prefix}-{pk}'
+            ))
+        return range(first, first + count)
+
+    def seed_titles(self, writer, options, users, categories, genres):
+        """
+        Создаёт произведения вместе с их жанрами, отзывами и
+        комментариями; сумма оценок и число отзывов считаются сразу.
+        """
+        rng = self.rng
+        review_counts = zipf_counts(
+            options['reviews'], options['titles'], options['zipf'],
+            len(users), rng
+        )
+        comments_mean = options['comments'] / max(sum(review_counts), 1)
+        title_pk, genre_title_pk = next_pk(Title), next_pk(GenreTitle)
+        review_pk, comment_pk = next_pk(Review), next_pk(Comment)
+        for review_count in review_counts:
+            quality = rng.uniform(3, 9)
+            scores = [
+                min(10, max(1, round(rng.gauss(quality, 1.5))))
+                for _ in range(review_count)
+            ]
+            writer.add(Title(
+                pk=title_pk,
+                name=f'Произведение {title_pk}',
+                year=1900 + round(124 * rng.betavariate(5, 1.5)),
+                category_id=rng.choice(categories),
+                description='Описание произведения. ' * rng.randint(1, 10),
+                score_sum=sum(scores),
+                review_count=review_count,
+            ))
+            for genre_id in rng.sample(genres, min(len(genres),
+                                                   rng.randint(1, 3))):
+                writer.add(GenreTitle(
+                    pk=genre_title_pk, title_id=title_pk, genre_id=genre_id
+                ))
+                genre_title_pk += 1
+            authors = rng.sample(users, review_count)
+            for author_id, score in zip(authors, scores):
+                pub_date = self.random_date()
+                writer.add(Review(
+                    pk=review_pk, title_id=title_pk, author_id=author_id,
+                    score=score, pub_date=pub_date,
+                    text='Текст отзыва. ' * rng.randint(1, 20),
+                ))
+                for _ in range(geometric(rng, comments_mean)):
+                    writer.add(Comment(
+                        pk=comment_pk, review_id=review_pk,
+                        author_id=rng.choice(users),
+                        pub_date=self.random_date(pub_date),
+                        text='Текст комментария. ' * rng.randint(1, 5),
+                    ))
+                    comment_pk += 1
+                review_pk += 1
+            title_pk += 1
@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-18 05:07
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_fields(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.annotate(
+        actual_sum=Sum('reviews__score'), actual_count=Count('reviews')
+    ).filter(actual_count__gt=0)
+    for title in titles.iterator():
+        title.score_sum = title.actual_sum
+        title.review_count = title.actual_count
+        title.save(update_fields=['score_sum', 'review_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_alter_review_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 3.2 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+VERSION_TABLE = 'reviews_dataversion'
+UPSERT = 'ON CONFLICT(name) DO UPDATE SET version = version + 1;'
+
+
+def bump(*names):
+    return ''.join(
+        f'INSERT INTO {VERSION_TABLE}(name, version) VALUES ({name}, 1) '
+        f'{UPSERT}\n'
+        for name in names
+    )
+
+
+def bump_rows(name, source):
+    return (
+        f'INSERT INTO {VERSION_TABLE}(name, version) '
+        f'SELECT {name}, 1 FROM {source} {UPSERT}\n'
+    )
+
+
+TRIGGERS = {
+    'dataversion_title_insert': (
+        'AFTER INSERT ON reviews_title',
+        bump("'titles'", "'title:' || new.id"),
+    ),
+    'dataversion_title_update': (
+        'AFTER UPDATE ON reviews_title',
+        bump("'titles'", "'title:' || old.id", "'title:' || new.id"),
+    ),
+    'dataversion_title_delete': (
+        'AFTER DELETE ON reviews_title',
+        bump("'titles'", "'title:' || old.id"),
+    ),
+    'dataversion_genretitle_insert': (
+        'AFTER INSERT ON reviews_genretitle',
+        bump("'titles'", "'title:' || new.title_id"),
+    ),
+    'dataversion_genretitle_update': (
+        'AFTER UPDATE ON reviews_genretitle',
+        bump("'titles'", "'title:' || old.title_id",
+             "'title:' || new.title_id"),
+    ),
+    'dataversion_genretitle_delete': (
+        'AFTER DELETE ON reviews_genretitle',
+        bump("'titles'", "'title:' || old.title_id"),
+    ),
+    'dataversion_category_update': (
+        'AFTER UPDATE OF name, slug ON reviews_category',
+        bump("'titles'") + bump_rows(
+            "'title:' || id", 'reviews_title WHERE category_id = new.id'
+        ),
+    ),
+    'dataversion_genre_update': (
+        'AFTER UPDATE OF name, slug ON reviews_genre',
+        bump("'titles'") + bump_rows(
+            "'title:' || title_id",
+            'reviews_genretitle WHERE genre_id = new.id'
+        ),
+    ),
+    'dataversion_review_insert': (
+        'AFTER INSERT ON reviews_review',
+        bump("'reviews:' || new.title_id"),
+    ),
+    'dataversion_review_update': (
+        'AFTER UPDATE ON reviews_review',
+        bump("'reviews:' || old.title_id", "'reviews:' || new.title_id"),
+    ),
+    'dataversion_review_delete': (
+        'AFTER DELETE ON reviews_review',
+        bump("'reviews:' || old.title_id"),
+    ),
+    'dataversion_comment_insert': (
+        'AFTER INSERT ON reviews_comment',
+        bump("'comments:' || new.review_id"),
+    ),
+    'dataversion_comment_update': (
+        'AFTER UPDATE ON reviews_comment',
+        bump("'comments:' || old.review_id", "'comments:' || new.review_id"),
+    ),
+    'dataversion_comment_delete': (
+        'AFTER DELETE ON reviews_comment',
+        bump("'comments:' || old.review_id"),
+    ),
+    # Имя автора выводится в отзывах и комментариях. Django сохраняет
+    # все колонки пользователя, поэтому нужна проверка, что имя изменилось.
+    'dataversion_username_update': (
+        'AFTER UPDATE OF username ON users_user '
+        'WHEN old.username IS NOT new.username',
+        bump_rows(
+            "'reviews:' || title_id",
+            'reviews_review WHERE author_id = new.id'
+        ) + bump_rows(
+            "'comments:' || review_id",
+            'reviews_comment WHERE author_id = new.id'
+        ),
+    ),
+}
+
+CREATE_SQL = tuple(
+    f'CREATE TRIGGER {name} {event} BEGIN\n{body}END'
+    for name, (event, body) in TRIGGERS.items()
+)
+DROP_SQL = tuple(f'DROP TRIGGER IF EXISTS {name}' for name in TRIGGERS)
+
+
+def run_statements(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement, params=None)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_fts'),
+        ('users', '0006_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Набор данных')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия данных',
+                'verbose_name_plural': 'Версии данных',
+            },
+        ),
+        migrations.RunPython(
+            run_statements(CREATE_SQL), run_statements(DROP_SQL)
+        ),
+    ]
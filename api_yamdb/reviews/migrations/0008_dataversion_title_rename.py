@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 09:40
+
+from django.db import migrations
+
+# Название произведения выводится в каждом отзыве, поэтому его смена
+# меняет и версию отзывов этого произведения.
+CREATE_SQL = (
+    'CREATE TRIGGER dataversion_title_rename '
+    'AFTER UPDATE OF name ON reviews_title '
+    'WHEN old.name IS NOT new.name BEGIN\n'
+    "INSERT INTO reviews_dataversion(name, version) "
+    "VALUES ('reviews:' || new.id, 1) "
+    'ON CONFLICT(name) DO UPDATE SET version = version + 1;\n'
+    'END'
+)
+DROP_SQL = 'DROP TRIGGER IF EXISTS dataversion_title_rename'
+
+
+def run_statement(statement):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        schema_editor.execute(statement, params=None)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_data_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statement(CREATE_SQL), run_statement(DROP_SQL)
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 from users.models import User
@@ -79,10 +79,36 @@ class Title(models.Model):
         related_name='titles',
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0
+    )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по накопленным сумме и числу отзывов."""
+        if not self.review_count:
+            return None
+        return self.score_sum / self.review_count
+
+    @classmethod
+    def change_rating(cls, title_id, score=0, count=0):
+        """
+        Атомарно сдвигает сумму оценок и число отзывов
+        произведения на переданные величины.
+        """
+        cls.objects.filter(pk=title_id).update(
+            score_sum=models.F('score_sum') + score,
+            review_count=models.F('review_count') + count
+        )
+
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
@@ -136,13 +162,35 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField(auto_now_add=True)
 
+    # Произведение и оценка, загруженные из БД: по ним сигналы
+    # reviews.signals сдвигают рейтинг на разницу при сохранении.
+    loaded_rating = None
+
     def __str__(self):
         return f'{self.title.name}: {self.score}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        if 'title_id' in review.__dict__ and 'score' in review.__dict__:
+            review.loaded_rating = (review.title_id, review.score)
+        return review
+
+    def save(self, *args, **kwargs):
+        """Отзыв и рейтинг произведения сохраняются в одной транзакции."""
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ['pub_date']
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -178,3 +226,35 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+
+class DataVersion(models.Model):
+    """
+    Версия набора данных, по которой строится ETag ответов API:
+    titles, title:<id>, reviews:<id произведения>, comments:<id отзыва>.
+    Строки создают и увеличивают триггеры БД из миграций 0007 и 0008, поэтому
+    версия меняется при любой записи, включая массовый импорт, и
+    одинакова во всех процессах приложения.
+    """
+    name = models.CharField(
+        verbose_name='Набор данных',
+        max_length=64,
+        primary_key=True
+    )
+    version = models.PositiveBigIntegerField(
+        verbose_name='Версия',
+        default=0
+    )
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
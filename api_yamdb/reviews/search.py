@@ -0,0 +1,68 @@
+"""Полнотекстовый поиск произведений на основе SQLite FTS5.
+
+Индекс reviews_title_fts и поддерживающие его триггеры создаются
+миграцией, если SQLite собран с FTS5. Если индекса нет (другая СУБД,
+SQLite без FTS5 или триггеры потеряны при пересоздании таблицы),
+поиск сводится к прежнему фильтру по вхождению в название.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+FTS_TRIGGERS = (
+    'reviews_title_fts_insert',
+    'reviews_title_fts_update',
+    'reviews_title_fts_delete',
+)
+WORD_RE = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=None)
+def _fts_ready(database_name):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT count(*) FROM sqlite_master '
+            'WHERE name IN (%s, %s, %s, %s)',
+            (FTS_TABLE, *FTS_TRIGGERS),
+        )
+        return cursor.fetchone()[0] == len(FTS_TRIGGERS) + 1
+
+
+def fts_available():
+    """Проверяет, что индекс и триггеры синхронизации на месте."""
+    if connection.vendor != 'sqlite':
+        return False
+    return _fts_ready(str(connection.settings_dict['NAME']))
+
+
+def build_match_expression(query):
+    """
+    Превращает пользовательский запрос в выражение MATCH:
+    каждое слово ищется по префиксу, все слова обязательны.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по запросу, сортируя по релевантности."""
+    if not fts_available():
+        return queryset.filter(name__contains=query)
+    match = build_match_expression(query)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    return queryset.filter(
+        pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,)
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = {table}.id',
+            (match,)
+        )
+    ).order_by('search_rank', 'name')
@@ -0,0 +1,59 @@
+"""Поддержка суммы оценок и числа отзывов произведений.
+
+Рейтинг сдвигается при любом сохранении и удалении отзыва через ORM:
+из API, админки и при каскадном удалении пользователя или
+произведения. Массовые вставки и QuerySet.update сигналов не вызывают,
+после них рейтинг пересчитывает команда recalculate_ratings.
+
+Сигнал data_loaded отправляют команды массовой загрузки (import, seed),
+чтобы другие приложения сбросили свои кэши.
+"""
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import Signal
+
+from .models import Review, Title
+
+data_loaded = Signal()
+
+
+def remember_rating(sender, instance, raw, **kwargs):
+    """Запоминает произведение и оценку отзыва до изменения."""
+    if raw or instance._state.adding:
+        return
+    previous = instance.loaded_rating
+    if previous is None:
+        previous = Review.objects.filter(pk=instance.pk).values_list(
+            'title_id', 'score'
+        ).first()
+    instance.previous_rating = previous
+
+
+def apply_rating(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        Title.change_rating(instance.title_id, score=instance.score, count=1)
+    else:
+        previous = getattr(instance, 'previous_rating', None)
+        if previous is not None:
+            title_id, score = previous
+            if title_id != instance.title_id:
+                Title.change_rating(title_id, score=-score, count=-1)
+                Title.change_rating(
+                    instance.title_id, score=instance.score, count=1
+                )
+            elif score != instance.score:
+                Title.change_rating(
+                    title_id, score=instance.score - score
+                )
+    instance.loaded_rating = (instance.title_id, instance.score)
+
+
+def withdraw_rating(sender, instance, **kwargs):
+    """Удаление выполняется в транзакции, общей с этим обновлением."""
+    Title.change_rating(instance.title_id, score=-instance.score, count=-1)
+
+
+pre_save.connect(remember_rating, sender=Review)
+post_save.connect(apply_rating, sender=Review)
+pre_delete.connect(withdraw_rating, sender=Review)
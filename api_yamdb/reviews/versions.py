@@ -0,0 +1,54 @@
+"""Версии данных для ETag ответов API.
+
+Таблицу DataVersion ведут триггеры SQLite из миграций 0007 и 0008: любая
+запись в произведения, жанры, категории, отзывы и комментарии, а также
+смена имени автора или названия произведения увеличивают версии
+затронутых наборов. Версии
+хранятся в БД, поэтому их видят все процессы приложения, а массовый
+импорт меняет их так же, как запись через API. Если триггеров нет
+(другая СУБД или таблица пересоздана без них), ETag не выдаётся.
+"""
+from functools import lru_cache
+
+from django.db import connection
+
+from .models import DataVersion
+
+VERSION_TRIGGERS = tuple(
+    f'dataversion_{table}_{event}'
+    for table in ('title', 'genretitle', 'review', 'comment')
+    for event in ('insert', 'update', 'delete')
+) + (
+    'dataversion_category_update',
+    'dataversion_genre_update',
+    'dataversion_username_update',
+    'dataversion_title_rename',
+)
+
+
+@lru_cache(maxsize=None)
+def _triggers_ready(database_name):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' "
+            'AND name LIKE %s',
+            ('dataversion_%',),
+        )
+        return cursor.fetchone()[0] == len(VERSION_TRIGGERS)
+
+
+def versions_tracked():
+    """Проверяет, что версии поддерживаются триггерами."""
+    if connection.vendor != 'sqlite':
+        return False
+    return _triggers_ready(str(connection.settings_dict['NAME']))
+
+
+def get_versions(names):
+    """Версии наборов одним запросом; у не менявшихся наборов — 0."""
+    versions = dict(
+        DataVersion.objects.filter(name__in=names).values_list(
+            'name', 'version'
+        )
+    )
+    return [versions.get(name, 0) for name in names]
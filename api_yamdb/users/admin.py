@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class AdminUser(admin.ModelAdmin):
@@ -12,4 +12,14 @@ class AdminUser(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class AdminOutgoingEmail(admin.ModelAdmin):
+    """Настройка админки для очереди писем."""
+    list_display = ('recipient', 'subject', 'status', 'attempts',
+                    'created_at', 'sent_at', 'next_attempt_at')
+    search_fields = ('recipient',)
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+
 admin.site.register(User, AdminUser)
+admin.site.register(OutgoingEmail, AdminOutgoingEmail)
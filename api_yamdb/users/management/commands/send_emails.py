@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from users.outbox import drain_outbox, outbox_metrics, run_worker
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди исходящих'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Количество писем, отправляемых за одну пачку'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Пауза между проверками очереди в секундах'
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write('Обработчик очереди писем запущен')
+            run_worker(options['interval'], options['batch_size'])
+            return
+        sent = drain_outbox(options['batch_size'])
+        metrics = outbox_metrics()
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {sent}, '
+            f'в очереди: {metrics["queue_depth"]}, '
+            f'неудачных попыток: {metrics["failed_attempts"]}, '
+            f'средняя задержка: {metrics["send_latency_avg"]:.2f} с'
+        ))
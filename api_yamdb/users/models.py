@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -34,10 +36,50 @@ class User(AbstractUser):
         blank=True,
         null=True,
     )
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токенов',
+        default=0,
+    )
+
+    loaded_permissions = None
 
     class Meta:
         ordering = ('username',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if 'role' in user.__dict__ and 'is_superuser' in user.__dict__:
+            user.loaded_permissions = (user.role, user.is_superuser)
+        return user
+
+    def permissions_changed(self):
+        """Проверка, изменились ли роль или права суперпользователя."""
+        if self._state.adding:
+            return False
+        previous = self.loaded_permissions
+        if previous is None:
+            previous = User.objects.filter(pk=self.pk).values_list(
+                'role', 'is_superuser'
+            ).first()
+        return previous not in (None, (self.role, self.is_superuser))
+
+    def save(self, *args, **kwargs):
+        """Смена роли или прав суперпользователя отзывает выданные токены."""
+        update_fields = kwargs.get('update_fields')
+        tracked = update_fields is None or bool(
+            {'role', 'is_superuser'}.intersection(update_fields)
+        )
+        revoke = tracked and self.permissions_changed()
+        if revoke:
+            self.token_version = F('token_version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        if revoke:
+            self.refresh_from_db(fields=['token_version'])
+        self.loaded_permissions = (self.role, self.is_superuser)
+
     @property
     def is_admin(self):
         """Проверка наличия прав администратора."""
@@ -55,3 +97,69 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUSES = [
+        (PENDING, 'pending'),
+        (SENT, 'sent'),
+        (FAILED, 'failed'),
+    ]
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=255,
+    )
+    message = models.TextField(
+        verbose_name='Текст',
+    )
+    recipient = models.EmailField(
+        verbose_name='Получатель',
+        max_length=254,
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=7,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки',
+        default=0,
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        default=timezone.now,
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Поставлено в очередь',
+        auto_now_add=True,
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Отправлено',
+        null=True,
+        blank=True,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,234 @@
+"""Очередь исходящих писем.
+
+Запрос только сохраняет письмо в таблицу OutgoingEmail, а отправку
+выполняет обработчик очереди: команда send_emails или фоновый поток
+внутри процесса. Режим задаётся настройкой EMAIL_OUTBOX_MODE:
+
+* ``thread`` — письмо отправляет фоновый поток процесса;
+* ``worker`` — письма отправляет отдельно запущенная команда;
+* ``eager`` — очередь разбирается сразу в запросе (для тестов).
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+# Время, на которое пачка писем закрепляется за обработчиком,
+# чтобы параллельный обработчик не отправил их повторно.
+CLAIM_SECONDS = 300
+
+
+class OutboxStats:
+    """Счётчики обработчиков очереди в текущем процессе."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.failed_attempts = 0
+        self.given_up = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record(self, sent_latencies, failed, given_up):
+        with self.lock:
+            self.sent += len(sent_latencies)
+            self.failed_attempts += failed
+            self.given_up += given_up
+            self.latency_total += sum(sent_latencies)
+            self.latency_max = max([self.latency_max, *sent_latencies])
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'sent': self.sent,
+                'failed_attempts': self.failed_attempts,
+                'given_up': self.given_up,
+                'send_latency_avg': (
+                    self.latency_total / self.sent if self.sent else 0.0
+                ),
+                'send_latency_max': self.latency_max,
+            }
+
+
+stats = OutboxStats()
+
+
+def queue_depth():
+    return OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING).count()
+
+
+def outbox_metrics():
+    """Глубина очереди и статистика отправки для мониторинга."""
+    return {'queue_depth': queue_depth(), **stats.snapshot()}
+
+
+def enqueue_email(subject, message, recipient):
+    """Ставит письмо в очередь и будит обработчик после коммита."""
+    email = OutgoingEmail.objects.create(
+        subject=subject, message=message, recipient=recipient
+    )
+    mode = settings.EMAIL_OUTBOX_MODE
+    if mode == 'eager':
+        drain_outbox()
+    elif mode == 'thread':
+        transaction.on_commit(wake_worker)
+    return email
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_batch(batch_size):
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+    )
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    claimed_until = now + timedelta(seconds=CLAIM_SECONDS)
+    due.filter(pk__in=ids).update(next_attempt_at=claimed_until)
+    return list(OutgoingEmail.objects.filter(
+        pk__in=ids, next_attempt_at=claimed_until
+    ))
+
+
+def record_failure(email, error):
+    """
+    Записывает неудачную попытку отправки и назначает следующую.
+    Возвращает True, если попытки исчерпаны и письмо больше не отправится.
+    """
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+        return True
+    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    return False
+
+
+def save_batch(emails, sent_latencies, failed, given_up):
+    OutgoingEmail.objects.bulk_update(
+        emails,
+        ['status', 'attempts', 'next_attempt_at', 'sent_at', 'last_error']
+    )
+    stats.record(sent_latencies, failed, given_up)
+
+
+def send_batch(emails, connection):
+    sent_latencies, failed, given_up = [], 0, 0
+    for email in emails:
+        email.attempts += 1
+        try:
+            EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                to=[email.recipient],
+                connection=connection,
+            ).send()
+        except Exception as error:
+            logger.warning('Не удалось отправить письмо %s: %s',
+                           email.pk, error)
+            failed += 1
+            given_up += record_failure(email, error)
+            continue
+        email.status = OutgoingEmail.SENT
+        email.sent_at = timezone.now()
+        email.last_error = ''
+        sent_latencies.append(
+            (email.sent_at - email.created_at).total_seconds()
+        )
+    save_batch(emails, sent_latencies, failed, given_up)
+    return len(sent_latencies)
+
+
+def fail_batch(emails, error):
+    """Засчитывает попытку всем письмам пачки, если сервер недоступен."""
+    logger.warning('Не удалось подключиться к почтовому серверу: %s', error)
+    given_up = 0
+    for email in emails:
+        email.attempts += 1
+        given_up += record_failure(email, error)
+    save_batch(emails, [], len(emails), given_up)
+
+
+def drain_outbox(batch_size=None):
+    """
+    Отправляет все письма, срок которых подошёл, пачками через одно
+    соединение с почтовым сервером. Возвращает число отправленных.
+    Если соединение открыть не удалось, неудачная попытка записывается
+    письмам первой пачки, а остальные ждут следующего запуска.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = 0
+    connection = None
+    try:
+        emails = claim_batch(batch_size)
+        while emails:
+            if connection is None:
+                connection = get_connection()
+                try:
+                    connection.open()
+                except Exception as error:
+                    connection = None
+                    fail_batch(emails, error)
+                    break
+            sent += send_batch(emails, connection)
+            emails = claim_batch(batch_size)
+    finally:
+        if connection is not None:
+            connection.close()
+    return sent
+
+
+class OutboxWorker(threading.Thread):
+    """Фоновый поток, разбирающий очередь по сигналу или по таймеру."""
+
+    def __init__(self):
+        super().__init__(name='email-outbox', daemon=True)
+        self.wakeup = threading.Event()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(settings.EMAIL_OUTBOX_POLL_INTERVAL)
+            self.wakeup.clear()
+            try:
+                drain_outbox()
+            except Exception:
+                logger.exception('Ошибка обработчика очереди писем')
+            finally:
+                close_old_connections()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def wake_worker():
+    """Запускает фоновый поток при первом письме и будит его."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = OutboxWorker()
+            _worker.start()
+    _worker.wakeup.set()
+
+
+def run_worker(interval, batch_size=None):
+    """Бесконечный цикл обработчика для команды send_emails."""
+    while True:
+        drain_outbox(batch_size)
+        close_old_connections()
+        time.sleep(interval)
@@ -0,0 +1,6 @@
+"""Замеры производительности API на тестовой базе данных.
+
+Скрипты запускаются из корня репозитория, например:
+
+    python -m benchmarks.bench_token
+"""
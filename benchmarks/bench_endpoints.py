@@ -0,0 +1,152 @@
+"""Замеры эндпоинтов роутера API со сравнением с базовой линией.
+
+Данные создаёт команда seed. Для каждого эндпоинта записываются
+перцентили времени ответа, число запросов к БД и пик выделенной
+памяти. Результат сравнивается с benchmarks/baseline.json: если время
+p50 или память выросли больше допуска или запросов к БД стало больше,
+скрипт завершается с кодом 1.
+Обновить базовую линию: --update-baseline.
+"""
+import argparse
+import json
+import sys
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.runner import (measure, measure_memory, report,
+                               setup_django, summarize, test_database)
+
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def endpoints():
+    """Пути GET-запросов ко всем маршрутам роутера api/urls.py."""
+    from reviews.models import Comment, Genre
+    from users.models import User
+
+    comment = Comment.objects.select_related('review').order_by(
+        '-review__title__review_count', 'pk'
+    ).first()
+    genre = Genre.objects.order_by('pk').first()
+    review = comment.review
+    user = User.objects.order_by('pk').first()
+    title_url = f'/api/v1/titles/{review.title_id}/'
+    review_url = f'{title_url}reviews/{review.pk}/'
+    return {
+        'users-list': '/api/v1/users/',
+        'users-detail': f'/api/v1/users/{user.username}/',
+        'users-me': '/api/v1/users/me/',
+        'categories-list': '/api/v1/categories/',
+        'genres-list': '/api/v1/genres/',
+        'titles-list': '/api/v1/titles/',
+        'titles-filter': f'/api/v1/titles/?genre={genre.slug}',
+        'titles-detail': title_url,
+        'reviews-list': f'{title_url}reviews/',
+        'reviews-detail': review_url,
+        'comments-list': f'{review_url}comments/',
+        'comments-detail': f'{review_url}comments/{comment.pk}/',
+    }
+
+
+def run(args):
+    from django.conf import settings
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+
+    from api.authentication import issue_access_token
+    from users.models import User
+
+    # Замеряется обработка запроса, а не кэш ответов каталога.
+    settings.CATALOG_CACHE_TIMEOUT = 0
+    call_command(
+        'seed', titles=args.titles, users=args.users, reviews=args.reviews,
+        comments=args.comments, seed=args.seed, stdout=StringIO()
+    )
+    admin = User.objects.create(
+        username='bench_admin', email='bench_admin@yamdb.fake', role='admin'
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {issue_access_token(admin)}'
+    )
+    results = {}
+    for name, url in endpoints().items():
+        def call():
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'{url}: статус {response.status_code}'
+            )
+        samples, queries = measure(call, args.repeat)
+        report(name, samples, queries)
+        summary = summarize(samples)
+        results[name] = {
+            'p50_ms': round(summary['p50'], 3),
+            'p95_ms': round(summary['p95'], 3),
+            'queries': queries,
+            'memory_kb': round(measure_memory(call), 1),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Список описаний регрессий относительно базовой линии."""
+    regressions = []
+    for name, current in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if current['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: запросов к БД {current["queries"]}, '
+                f'в базовой линии {expected["queries"]}'
+            )
+        for metric in ('p50_ms', 'memory_kb'):
+            limit = expected[metric] * (1 + tolerance)
+            if current[metric] > limit:
+                growth = current[metric] / expected[metric] - 1
+                regressions.append(
+                    f'{name}: {metric} {current[metric]} больше '
+                    f'{expected[metric]} на {growth:.0%}'
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--reviews', type=int, default=4000)
+    parser.add_argument('--comments', type=int, default=8000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument(
+        '--tolerance', type=float, default=0.5,
+        help='Допустимый относительный рост времени и памяти.'
+    )
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        results = run(args)
+
+    if args.update_baseline:
+        args.baseline.write_text(
+            json.dumps(results, indent=2, sort_keys=True) + '\n'
+        )
+        print(f'Базовая линия записана в {args.baseline}')
+        return 0
+    if not args.baseline.exists():
+        print(f'Базовая линия {args.baseline} не найдена')
+        return 1
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        print(f'РЕГРЕССИЯ {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
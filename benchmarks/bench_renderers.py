@@ -0,0 +1,66 @@
+"""Сравнение JSONRenderer из DRF и FastJSONRenderer.
+
+Рендерятся страницы произведений и отзывов в том виде, в каком их
+отдаёт API, а также готовый фрагмент RawJSON из кэша ответов.
+"""
+import argparse
+from collections import OrderedDict
+from io import StringIO
+
+from benchmarks.runner import measure, report, setup_django, test_database
+
+
+def page(results):
+    return OrderedDict(
+        count=len(results), next=None, previous=None, results=results
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.core.management import call_command
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import FastJSONRenderer
+    from api.serializers import ReadOnlyTitleSerializer, ReviewSerializer
+    from reviews.models import Title
+
+    with test_database():
+        call_command(
+            'seed', titles=args.page_size, users=args.page_size,
+            reviews=args.page_size * 10, comments=0, stdout=StringIO()
+        )
+        title = Title.objects.order_by('-review_count').first()
+        pages = {
+            'titles': page(ReadOnlyTitleSerializer(
+                Title.objects.select_related('category').prefetch_related(
+                    'genre'
+                ),
+                many=True
+            ).data),
+            'reviews': page(ReviewSerializer(
+                title.reviews.select_related('author')[:args.page_size],
+                many=True
+            ).data),
+        }
+        drf, fast = JSONRenderer(), FastJSONRenderer()
+        for name, data in pages.items():
+            assert drf.render(data) == fast.render(data)
+            raw = fast.encode(data)
+            for label, call in (
+                ('drf', lambda: drf.render(data)),
+                ('fast', lambda: fast.render(data)),
+                ('fast stream', lambda: b''.join(fast.iter_render(data))),
+                ('fast raw', lambda: fast.render(raw)),
+            ):
+                samples, _ = measure(call, args.repeat)
+                report(f'{name} {label}', samples, 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Замер эндпоинта /api/v1/auth/token/.
+
+Случаи: верный код, неверный код и неизвестный пользователь.
+"""
+import argparse
+
+from benchmarks.runner import measure, report, setup_django, test_database
+
+URL = '/api/v1/auth/token/'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth.tokens import default_token_generator
+    from rest_framework.test import APIClient
+
+    from users.models import User
+
+    with test_database():
+        user = User.objects.create(
+            username='bench_user', email='bench_user@yamdb.fake'
+        )
+        code = default_token_generator.make_token(user)
+        cases = (
+            ('valid', 200, {'username': user.username,
+                            'confirmation_code': code}),
+            ('invalid_code', 400, {'username': user.username,
+                                   'confirmation_code': 'wrong-code'}),
+            ('unknown_user', 404, {'username': 'nobody',
+                                   'confirmation_code': code}),
+        )
+        client = APIClient()
+        for name, expected_status, data in cases:
+            status_code = client.post(URL, data=data).status_code
+            assert status_code == expected_status, (
+                f'{name}: ожидался статус {expected_status}, '
+                f'получен {status_code}'
+            )
+            samples, queries = measure(
+                lambda: client.post(URL, data=data), args.repeat
+            )
+            report(f'token {name}', samples, queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Общие средства для замеров: настройка Django, тестовая БД, статистика."""
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+
+
+def setup_django():
+    """Настраивает проект так же, как manage.py."""
+    import django
+
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    django.setup()
+    # Ответы 4xx — ожидаемая часть замеров, их предупреждения не нужны.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+
+@contextmanager
+def test_database():
+    """Создаёт тестовую БД на время замеров и удаляет её после."""
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    index = round(percent / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+def measure(call, repeat, warmup=10):
+    """
+    Выполняет call warmup + repeat раз и возвращает время каждого из
+    repeat вызовов в миллисекундах и число запросов к БД в последнем.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(warmup):
+        call()
+    samples = []
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, len(context.captured_queries)
+
+
+def measure_memory(call):
+    """Пик памяти, выделенной за один вызов call, в килобайтах."""
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def summarize(samples):
+    return {
+        'mean': statistics.mean(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+    }
+
+
+def report(name, samples, queries):
+    summary = summarize(samples)
+    print(
+        f'{name:<32} '
+        + ' '.join(f'{key}={value:7.2f}ms' for key, value in summary.items())
+        + f' queries={queries}'
+    )
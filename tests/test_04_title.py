@@ -316,3 +316,58 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        response = client.get(f'{url}?search=терм')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}?search=` возвращает ответ '
+            'со статусом 200.'
+        )
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], (
+            f'Проверьте, что поиск через `{url}?search=` находит '
+            'произведение по началу слова из названия без учёта регистра.'
+        )
+
+        response = client.get(f'{url}?search=yippie')
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что поиск через `{url}?search=` учитывает '
+            'описание произведения.'
+        )
+
+        admin_client.patch(
+            f'{url}{titles[1]["id"]}/', data={'name': 'Die Hard'}
+        )
+        response = client.get(f'{url}?search=die')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(f'{url}{titles[1]["id"]}/')
+        response = client.get(f'{url}?search=die')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_07_titles_search_fallback(self, client, admin_client,
+                                       monkeypatch):
+        from reviews import search
+
+        titles, _, _ = create_titles(admin_client)
+        monkeypatch.setattr(search, 'fts_available', lambda: False)
+        response = client.get('/api/v1/titles/?search=орешек')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что без FTS5 поиск по `search` ищет вхождение '
+            'в название произведения.'
+        )
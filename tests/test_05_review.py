@@ -384,3 +384,78 @@ class Test05ReviewAPI:
                 f'Проверьте, что DELETE-запрос {role} к чужому отзыву через '
                 f'`{url_template}` удаляет отзыв.'
             )
+
+    def test_06_reviews_cursor_pagination(self, client, admin_client,
+                                          django_user_model):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        expected_ids = []
+        for idx in range(15):
+            author = django_user_model.objects.create_user(
+                username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title_id=titles[0]['id'], author=author,
+                text=f'review {idx}', score=idx % 10 + 1
+            )
+            expected_ids.append(review.id)
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=cursor'
+        received_ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что GET-запрос к '
+                '`/api/v1/titles/{title_id}/reviews/?pagination=cursor` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data and 'next' in data, (
+                'Проверьте, что курсорная пагинация отзывов не считает '
+                'общее количество записей и возвращает ссылку `next`.'
+            )
+            received_ids.extend(review['id'] for review in data['results'])
+            url = data['next']
+        assert received_ids == expected_ids, (
+            'Проверьте, что курсорная пагинация отдаёт все отзывы '
+            'в порядке публикации и без повторов.'
+        )
+
+    def test_07_duplicate_review_rejected_by_constraint(self, admin_client,
+                                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(user_client, titles[0]['id'], 'Первый', 8)
+
+        response = user_client.post(url, data={'text': 'Второй', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'non_field_errors' in response.json(), (
+            'Проверьте, что ответ на повторный отзыв содержит ошибку в '
+            '`non_field_errors`.'
+        )
+        response = user_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что отклонённый повторный отзыв не меняет рейтинг '
+            'произведения.'
+        )
+
+    def test_08_other_integrity_errors_not_hidden(self, admin_client,
+                                                  user_client, monkeypatch):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+
+        def fail(title_id, score=0, count=0):
+            raise IntegrityError('CHECK constraint failed: review_count')
+
+        monkeypatch.setattr(Title, 'change_rating', staticmethod(fail))
+        with pytest.raises(IntegrityError, match='review_count'):
+            user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Отзыв', 'score': 5}
+            )
+        assert not Review.objects.exists(), (
+            'Проверьте, что ошибка целостности, не связанная с повторным '
+            'отзывом, не выдаётся за ошибку валидации и откатывает запись.'
+        )
@@ -381,3 +381,25 @@ class Test06CommentAPI:
             'Проверьте, что DELETE-запрос неавторизованного пользователя к '
             f'`{url}` возвращает ответ со статусом 401.'
         )
+
+    def test_07_comment_review_scoped_by_title(self, admin_client, admin,
+                                               user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии недоступны по адресу с '
+            'произведением, к которому отзыв не относится.'
+        )
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что нельзя оставить комментарий к отзыву по адресу '
+            'с чужим произведением.'
+        )
+        response = user_client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
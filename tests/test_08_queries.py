@@ -0,0 +1,215 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.versions import versions_tracked
+from tests.utils import create_comments, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08QueryCount:
+    titles_count = 25
+
+    def create_many_titles(self, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        titles, categories, genres = create_titles(admin_client)
+        category = Category.objects.get(slug=categories[0]['slug'])
+        genre_list = list(Genre.objects.all())
+        for idx in range(len(titles), self.titles_count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genre_list)
+        return titles
+
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        self.create_many_titles(admin_client)
+        assert versions_tracked()
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            '`/api/v1/titles/` возвращает ответ со статусом 200.'
+        )
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/?page=2')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что вторая страница `/api/v1/titles/` доступна.'
+        )
+        for title in response.json()['results']:
+            assert title['category'] and title['genre'], (
+                'Проверьте, что ответ на GET-запрос к `/api/v1/titles/` '
+                'содержит категорию и жанры произведения.'
+            )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles = self.create_many_titles(admin_client)
+        assert versions_tracked()
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            '`/api/v1/titles/{titles_id}/` возвращает ответ со статусом 200.'
+        )
+        assert len(response.json()['genre']) == len(titles[0]['genre']), (
+            'Проверьте, что ответ на GET-запрос к `/api/v1/titles/{title_id}/`'
+            ' содержит все жанры произведения.'
+        )
+
+    def test_03_review_write_loads_only_needed_columns(
+            self, admin_client, admin, user, user_client,
+            django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = next(
+            review for review in reviews if review['author'] == user.username
+        )
+        comment = next(
+            comment for comment in comments
+            if comment['author'] == user.username
+        )
+        comment_url = (
+            f'{review_url}{reviews[0]["id"]}/comments/{comment["id"]}/'
+        )
+        # Отзыв, транзакция и обновление отзыва; без запроса произведения.
+        with django_assert_num_queries(3) as context:
+            response = user_client.patch(
+                f'{review_url}{review["id"]}/', data={'text': 'Правка'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['title'] == titles[0]['name']
+        assert not [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "users_user"'
+            in query['sql']
+        ], (
+            'Проверьте, что изменение отзыва не загружает автора '
+            'отдельным запросом.'
+        )
+
+        with django_assert_num_queries(2):
+            response = user_client.patch(comment_url, data={'text': 'Правка'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение комментария не загружает отзыв '
+            'отдельным запросом.'
+        )
+        with django_assert_num_queries(2):
+            response = user_client.delete(comment_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        # Отзыв, транзакция, рейтинг, комментарии отзыва и сам отзыв.
+        with django_assert_num_queries(5) as context:
+            response = user_client.delete(f'{review_url}{review["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        review_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert len(review_selects) == 1 and (
+            '"reviews_review"."text"' not in review_selects[0]
+        ), (
+            'Проверьте, что перед удалением отзыва загружаются только поля, '
+            'нужные для проверки прав.'
+        )
+
+    def test_04_review_create_loads_title_once(self, admin_client,
+                                               user_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Отзыв', 'score': 7}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        title_selects = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_selects) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'из БД один раз.'
+        )
+
+    def test_05_signup_single_user_lookup(self, client, django_user_model):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        for attempt in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post('/api/v1/auth/signup/', data=data)
+            assert response.status_code == HTTPStatus.OK
+            user_selects = [
+                query for query in context.captured_queries
+                if query['sql'].startswith('SELECT')
+                and 'FROM "users_user"' in query['sql']
+            ]
+            assert len(user_selects) == 1, (
+                'Проверьте, что регистрация ищет пользователей по имени и '
+                'почте одним запросом.'
+            )
+        assert django_user_model.objects.filter(
+            username=data['username']
+        ).count() == 1
+
+    def test_06_sparse_fieldsets(self, client, admin_client, user_client,
+                                 django_assert_num_queries):
+        titles = self.create_many_titles(admin_client)
+        assert versions_tracked()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == HTTPStatus.OK
+        assert all(
+            set(title) == {'id', 'name', 'rating'}
+            for title in response.json()['results']
+        ), (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        assert len(context.captured_queries) == 3, (
+            'Проверьте, что для полей без связей не выполняется prefetch.'
+        )
+        assert all(
+            'description' not in query['sql']
+            and 'reviews_category' not in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что параметр `fields` ограничивает загружаемые '
+            'из БД колонки.'
+        )
+
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/?omit=genre')
+        assert 'genre' not in response.json()
+        assert response.json()['category'], (
+            'Проверьте, что параметр `omit` убирает из ответа только '
+            'перечисленные поля.'
+        )
+
+        response = client.get('/api/v1/titles/?fields=id,unknown')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` возвращает 400.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?fields=id,score'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.json()['results'] == [
+            {'id': response.json()['results'][0]['id'], 'score': 5}
+        ]
+        assert len(context.captured_queries) == 4, (
+            'Проверьте, что отзывы без поля `title` не дозагружают '
+            'произведение для каждой строки.'
+        )
+        assert all(
+            'users_user' not in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что без поля `author` отзывы загружаются без '
+            'присоединения таблицы пользователей.'
+        )
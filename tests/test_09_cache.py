@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CatalogCache:
+
+    def test_01_titles_cached_until_change(self, client, admin_client,
+                                           user_client,
+                                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        first = client.get(url)
+        with django_assert_num_queries(1):
+            second = client.get(url)
+        assert second.json() == first.json(), (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаёт '
+            'закэшированный ответ, запрашивая из БД только версии данных.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 8)
+        response = client.get(url)
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что после добавления отзыва кэш произведения '
+            'сбрасывается и рейтинг пересчитывается.'
+        )
+
+        admin_client.patch(url, data={'name': 'Терминатор 2'})
+        response = client.get(url)
+        assert response.json()['name'] == 'Терминатор 2', (
+            'Проверьте, что изменение произведения сбрасывает кэш.'
+        )
+
+    def test_02_query_params_normalized(self, client, admin_client,
+                                        django_assert_num_queries):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/?year=1984&genre=comedy')
+        with django_assert_num_queries(1):
+            response = client.get(
+                '/api/v1/titles/?genre=comedy&utm_source=x&year=1984'
+            )
+        assert response.json()['count'] == 1
+        response = client.get('/api/v1/titles/?genre=drama')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что ответы с разными параметрами фильтрации '
+            'кэшируются под разными ключами.'
+        )
+
+    def test_03_category_and_genre_invalidation(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = admin_client.delete(
+            f'/api/v1/categories/{categories[0]["slug"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что удаление категории сбрасывает кэш списка '
+            'категорий.'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш произведений.'
+        )
+
+        from reviews.models import Genre, Title
+
+        Title.objects.get(pk=titles[0]['id']).genre.add(
+            Genre.objects.get(slug='drama')
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert len(response.json()['genre']) == 3, (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш.'
+        )
+
+    def test_04_file_based_backend(self, client, admin_client, settings,
+                                   tmp_path, django_assert_num_queries):
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        create_titles(admin_client)
+        first = client.get('/api/v1/titles/')
+        with django_assert_num_queries(1):
+            second = client.get('/api/v1/titles/')
+        assert second.json() == first.json()
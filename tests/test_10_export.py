@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.datasets import DATASETS
+from reviews.models import Category, Genre, Title
+from users.models import User
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Export:
+    url = '/api/v1/export/{dataset}/'
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_01_export_permissions(self, client, user_client, admin_client):
+        url = self.url.format(dataset='titles')
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 401.'
+        )
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что выгрузка `{url}` доступна только администратору.'
+        )
+        response = admin_client.get(self.url.format(dataset='unknown'))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что выгрузка неизвестного набора данных возвращает '
+            'ответ со статусом 404.'
+        )
+        response = admin_client.get(f'{url}?output=xml')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_export_formats(self, admin_client, admin, user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(self.url.format(dataset='reviews'))
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews
+        ]
+        assert rows[0]['title_id'] == titles[0]['id']
+
+        response = admin_client.get(
+            self.url.format(dataset='titles') + '?output=csv'
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        assert [row['name'] for row in rows] == [
+            title['name'] for title in titles
+        ]
+        assert list(rows[0]) == [
+            'id', 'name', 'year', 'category_id', 'description'
+        ], (
+            'Проверьте, что колонки csv выгрузки совпадают с форматом '
+            'файлов команды import.'
+        )
+
+    def test_03_csv_round_trip(self, admin_client, admin, user_client, user,
+                               tmp_path):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Title.objects.filter(pk=titles[1]['id']).update(description=None)
+
+        def snapshot():
+            return {
+                name: list(dataset.model.objects.order_by('pk').values_list(
+                    *dataset.columns
+                ))
+                for name, dataset in DATASETS.items()
+            }
+
+        exported = snapshot()
+        call_command(
+            'export', '--output-dir', str(tmp_path), stdout=io.StringIO()
+        )
+        for model in (User, Title, Category, Genre):
+            model.objects.all().delete()
+        call_command('import', '--data-dir', str(tmp_path),
+                     stdout=io.StringIO(), stderr=io.StringIO())
+        assert snapshot() == exported, (
+            'Проверьте, что выгрузка в csv и повторный импорт '
+            'восстанавливают те же данные, включая пустые значения NULL.'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).description is None
@@ -0,0 +1,153 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review
+from tests.utils import (create_comments, create_reviews,
+                         create_single_review, create_titles)
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ConditionalGet:
+
+    def test_01_title_etag(self, client, admin_client, user_client,
+                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+        )
+        assert 'must-revalidate' in response['Cache-Control']
+        assert 'public' in response['Cache-Control']
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва ETag произведения '
+            'меняется.'
+        )
+        assert response['ETag'] != etag
+
+        response = admin_client.get(url)
+        assert 'private' in response['Cache-Control'], (
+            'Проверьте, что ответы авторизованным пользователям помечены '
+            'как private.'
+        )
+
+    def test_02_reviews_and_comments_etag(self, client, admin_client, admin,
+                                          user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+
+        user_client.patch(
+            f'{comments_url}{comments[1]["id"]}/', data={'text': 'Правка'}
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение комментария меняет ETag списка '
+            'комментариев.'
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что изменение комментария не меняет ETag отзывов.'
+        )
+
+        user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'Правка'}
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов.'
+        )
+
+    def test_03_etag_follows_bulk_writes_and_authors(self, client,
+                                                     admin_client, admin,
+                                                     user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+
+        Review.objects.filter(pk=reviews[0]['id']).update(text='Массово')
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзывов через QuerySet.update, '
+            'например при импорте, меняет ETag списка отзывов.'
+        )
+        assert 'Массово' in {
+            review['text'] for review in response.json()['results']
+        }, 'Проверьте, что после смены ETag отдаётся новое тело ответа.'
+        reviews_etag = response['ETag']
+
+        User.objects.filter(pk=user.pk).update(bio='Новое о себе')
+        user.refresh_from_db()
+        user.first_name = 'Имя'
+        user.save()
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что сохранение пользователя без смены имени не '
+            'меняет ETag отзывов.'
+        )
+
+        user.username = 'RenamedUser'
+        user.save()
+        for url, etag in ((reviews_url, reviews_etag),
+                          (comments_url, comments_etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что смена имени автора меняет ETag `{url}`.'
+            )
+        assert Comment.objects.filter(author=user).exists()
+
+    def test_04_title_rename_changes_reviews_etag(self, client,
+                                                  admin_client, admin,
+                                                  user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        list_url = f'{title_url}reviews/'
+        detail_url = f'{list_url}{reviews[0]["id"]}/'
+        etags = {url: client.get(url)['ETag'] for url in (list_url,
+                                                          detail_url)}
+
+        admin_client.patch(title_url, data={'name': 'Новое название'})
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что смена названия произведения меняет ETag '
+                f'`{url}`: название выводится в каждом отзыве.'
+            )
+        assert response.json()['title'] == 'Новое название'
+
+    def test_05_etag_namespaces_required(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from api.mixins import ConditionalGetMixin
+
+        class UnconfiguredView(ConditionalGetMixin):
+            pass
+
+        with pytest.raises(ImproperlyConfigured, match='UnconfiguredView'):
+            UnconfiguredView().get_etag_namespaces()
+        UnconfiguredView.etag_namespaces = ('titles',)
+        assert UnconfiguredView().get_etag_namespaces() == ('titles',)
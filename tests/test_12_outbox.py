@@ -0,0 +1,109 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12EmailOutbox:
+
+    def test_01_signup_enqueues_email(self, client, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import drain_outbox, outbox_metrics
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        outbox_before = len(mail.outbox)
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'email': 'queued@yamdb.fake', 'username': 'queued'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что регистрация только ставит письмо в очередь.'
+        )
+        assert outbox_metrics()['queue_depth'] == 1
+
+        assert drain_outbox() == 1
+        assert len(mail.outbox) == outbox_before + 1
+        assert mail.outbox[-1].to == ['queued@yamdb.fake']
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.SENT and email.sent_at
+        assert outbox_metrics()['queue_depth'] == 0
+
+    def test_02_retry_with_backoff(self, settings, monkeypatch):
+        from users import outbox
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+
+        def fail(message):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(outbox.EmailMessage, 'send', fail)
+        outbox.enqueue_email('Тема', 'Текст', 'retry@yamdb.fake')
+        assert outbox.drain_outbox() == 0
+
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=50)
+        assert outbox.drain_outbox() == 0, (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки.'
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        outbox.drain_outbox()
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после исчерпания попыток письмо помечается '
+            'как неотправленное.'
+        )
+
+    def test_03_connection_failure_counts_attempt(self, settings,
+                                                  monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from users import outbox
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+
+        def fail(backend):
+            raise ConnectionRefusedError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'open', fail, raising=False)
+        for index in range(2):
+            outbox.enqueue_email('Тема', 'Текст', f'{index}@yamdb.fake')
+        failed_before = outbox.stats.snapshot()['failed_attempts']
+        assert outbox.drain_outbox() == 0
+
+        for email in OutgoingEmail.objects.all():
+            assert email.status == OutgoingEmail.PENDING
+            assert email.attempts == 1, (
+                'Проверьте, что ошибка подключения к почтовому серверу '
+                'засчитывается письмам пачки как попытка.'
+            )
+            assert 'SMTP' in email.last_error
+            assert email.next_attempt_at > (
+                timezone.now() + timedelta(seconds=50)
+            )
+        assert outbox.stats.snapshot()['failed_attempts'] == (
+            failed_before + 2
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        outbox.drain_outbox()
+        assert set(OutgoingEmail.objects.values_list('status', flat=True)) == {
+            OutgoingEmail.FAILED
+        }, (
+            'Проверьте, что письма, которые не удалось отправить из-за '
+            'недоступного сервера, не повторяются бесконечно.'
+        )
@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.authentication import UserCache, issue_access_token
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13JwtClaims:
+
+    def test_01_claims_skip_user_lookup(self, admin,
+                                        django_assert_num_queries):
+        client = claims_client(admin)
+        client.get('/api/v1/users/')
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что токен с ролью даёт доступ к `/api/v1/users/`.'
+        )
+
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == admin.username, (
+            'Проверьте, что `/api/v1/users/me/` возвращает полный профиль '
+            'пользователя, аутентифицированного по токену с ролью.'
+        )
+
+    def test_02_role_change_revokes_token(self, admin_client, moderator):
+        client = claims_client(moderator)
+        url = f'/api/v1/users/{moderator.username}/'
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+
+        admin_client.patch(url, data={'role': 'user'})
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли ранее выданный токен '
+            'перестаёт действовать.'
+        )
+        moderator.refresh_from_db()
+        response = claims_client(moderator).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['role'] == 'user'
+
+        admin_client.delete(url)
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_role_change_outside_api_revokes_token(self, admin, moderator):
+        from users.models import User
+
+        admin_claims_client = claims_client(admin)
+        moderator.bio = 'Без смены роли'
+        moderator.save()
+        client = claims_client(moderator)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+
+        moderator.bio = 'Снова без смены роли'
+        moderator.save()
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что сохранение пользователя без смены роли не '
+            'отзывает его токены.'
+        )
+
+        user = User.objects.get(pk=moderator.pk)
+        user.role = User.USER
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что смена роли через ORM, например в админке, '
+            'отзывает ранее выданные токены.'
+        )
+
+        admin.is_superuser = True
+        admin.save(update_fields=['is_superuser'])
+        response = admin_claims_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что изменение прав суперпользователя отзывает '
+            'ранее выданные токены.'
+        )
+
+    def test_04_legacy_token_user_cache(self, user, user_client,
+                                        django_assert_num_queries):
+        user_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь, загруженный по токену без роли, '
+            'берётся из кэша при повторных запросах.'
+        )
+
+        user_client.patch('/api/v1/users/me/', data={'bio': 'Новое'})
+        user.is_active = False
+        user.save()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что изменение пользователя сбрасывает его кэш.'
+        )
+
+    def test_05_user_cache_bounds(self, user, admin):
+        user_cache = UserCache(maxsize=1, ttl=60)
+        user_cache.set(user.pk, user)
+        cached = user_cache.get(user.pk)
+        assert cached == user and cached is not user, (
+            'Проверьте, что кэш возвращает копию пользователя.'
+        )
+        user_cache.set(admin.pk, admin)
+        assert user_cache.get(user.pk) is None, (
+            'Проверьте, что кэш вытесняет давно использованные записи.'
+        )
+
+        expired_cache = UserCache(maxsize=1, ttl=-1)
+        expired_cache.set(admin.pk, admin)
+        assert expired_cache.get(admin.pk) is None, (
+            'Проверьте, что записи кэша устаревают.'
+        )
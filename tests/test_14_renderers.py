@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timezone
+from io import BytesIO
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONParser, FastJSONRenderer, RawJSON
+from tests.utils import create_comments, create_titles
+
+DATA = {
+    'count': 2,
+    'next': None,
+    'previous': None,
+    'results': [
+        {'id': 1, 'name': 'Строка\u2028с разделителем', 'rating': None},
+        {
+            'id': 2,
+            'pub_date': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+        },
+    ],
+}
+
+
+class Test14Renderers:
+
+    def test_01_same_output_as_drf(self):
+        renderer = FastJSONRenderer()
+        assert renderer.render(DATA) == JSONRenderer().render(DATA), (
+            'Проверьте, что FastJSONRenderer выдаёт тот же JSON, что и '
+            'стандартный JSONRenderer.'
+        )
+        assert renderer.render(None) == b''
+
+    def test_02_raw_fragments_and_streaming(self):
+        renderer = FastJSONRenderer()
+        raw = renderer.encode(DATA)
+        assert isinstance(raw, RawJSON)
+        assert renderer.encode(raw) is raw, (
+            'Проверьте, что готовый фрагмент RawJSON не кодируется повторно.'
+        )
+        assert renderer.render(raw) == JSONRenderer().render(DATA)
+        assert b''.join(
+            renderer.iter_render(DATA, chunk_size=1)
+        ) == renderer.render(DATA), (
+            'Проверьте, что iter_render выдаёт тот же JSON частями.'
+        )
+        indented = renderer.render(
+            raw, 'application/json; indent=2', {}
+        ).decode()
+        assert json.loads(indented) == json.loads(renderer.render(DATA))
+        assert '\n  ' in indented
+
+    def test_03_parser(self):
+        parsed = FastJSONParser().parse(
+            BytesIO('{"text": "Отзыв", "score": 7}'.encode())
+        )
+        assert parsed == {'text': 'Отзыв', 'score': 7}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cached_response_is_raw_json(self, client, admin_client):
+        create_titles(admin_client)
+        first = client.get('/api/v1/titles/')
+        second = client.get('/api/v1/titles/')
+        assert isinstance(second.data, RawJSON), (
+            'Проверьте, что закэшированный ответ хранится в виде готового '
+            'JSON.'
+        )
+        assert second.content == first.content
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT='text/html')
+        assert response['Content-Type'].startswith('text/html')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_large_pages_streamed(self, client, admin_client, admin,
+                                     user_client, user):
+        from reviews.models import Comment, Review
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        review = Review.objects.get(pk=reviews[0]['id'])
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {index}')
+            for index in range(150)
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.pk}/comments/'
+            '?pagination=cursor&page_size=120'
+        )
+        response = client.get(url)
+        assert response.streaming, (
+            'Проверьте, что большие страницы списка отдаются потоком.'
+        )
+        assert response['Content-Type'] == 'application/json'
+        assert response['ETag']
+        body = b''.join(response.streaming_content)
+        assert len(json.loads(body)['results']) == 120
+
+        response = client.get(url, HTTP_ACCEPT='application/json; indent=2')
+        assert not response.streaming
+        assert json.loads(response.content) == json.loads(body), (
+            'Проверьте, что потоковый ответ содержит тот же JSON.'
+        )
+        response = client.get(url.replace('120', '10'))
+        assert not response.streaming, (
+            'Проверьте, что страницы обычного размера не отдаются потоком.'
+        )
@@ -0,0 +1,77 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Sum
+
+
+def run_seed(**options):
+    call_command(
+        'seed', users=100, titles=30, reviews=300, comments=200, seed=7,
+        batch_size=50, stdout=StringIO(), **options
+    )
+
+
+def snapshot():
+    from reviews.models import Comment, GenreTitle, Review, Title
+
+    return (
+        list(Title.objects.order_by('pk').values_list(
+            'pk', 'name', 'year', 'category_id', 'score_sum', 'review_count'
+        )),
+        list(GenreTitle.objects.order_by('pk').values_list(
+            'title_id', 'genre_id'
+        )),
+        list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'review_id', 'author_id'
+        )),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Seed:
+
+    def test_01_seed_data(self):
+        from reviews.models import Review, Title
+        from users.models import User
+
+        run_seed()
+        assert User.objects.count() == 100
+        assert Review.objects.count() == 300, (
+            'Проверьте, что команда seed создаёт заданное число отзывов.'
+        )
+        assert not Review.objects.values('title', 'author').annotate(
+            total=Count('id')
+        ).filter(total__gt=1).exists(), (
+            'Проверьте, что команда seed соблюдает ограничение unique_review.'
+        )
+        counts = sorted(
+            Title.objects.values_list('review_count', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределены между произведениями '
+            'неравномерно.'
+        )
+        for title in Title.objects.annotate(
+                actual_sum=Sum('reviews__score'),
+                actual_count=Count('reviews')):
+            assert (title.score_sum, title.review_count) == (
+                title.actual_sum or 0, title.actual_count
+            ), 'Проверьте, что команда seed сразу считает рейтинги.'
+
+    def test_02_seed_reproducible(self):
+        from reviews.models import Category, Genre, Title
+        from users.models import User
+
+        run_seed()
+        first = snapshot()
+        for model in (Title, User, Category, Genre):
+            model.objects.all().delete()
+        run_seed()
+        assert snapshot() == first, (
+            'Проверьте, что одинаковое значение --seed даёт одинаковые данные.'
+        )
@@ -0,0 +1,182 @@
+import json
+import logging
+import threading
+
+import pytest
+from django.test import Client
+
+from monitoring.metrics import MetricsRegistry, registry
+from monitoring.models import SlowQuery
+from monitoring.slow_queries import normalize_sql
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Monitoring:
+
+    def test_01_server_timing_disabled(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без SERVER_TIMING_ENABLED заголовок '
+            'Server-Timing не добавляется.'
+        )
+
+    def test_02_server_timing_enabled(self, admin_client, settings, caplog):
+        create_titles(admin_client)
+        settings.SERVER_TIMING_ENABLED = True
+        with caplog.at_level(logging.INFO, logger='monitoring.requests'):
+            response = Client().get('/api/v1/titles/')
+        header = response.get('Server-Timing', '')
+        for phase in ('db;', 'serialize;', 'render;', 'total;'):
+            assert phase in header, (
+                f'Проверьте, что заголовок Server-Timing содержит фазу '
+                f'`{phase[:-1]}`.'
+            )
+        assert 'desc="4 queries"' in header
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['route'] == 'title-list'
+        assert record['queries'] == 4
+        assert record['serialize_ms'] > 0 and record['render_ms'] > 0, (
+            'Проверьте, что время сериализации и рендеринга учитывается.'
+        )
+
+    def test_03_normalize_sql(self):
+        first = normalize_sql(
+            'SELECT "id" FROM "reviews_title" WHERE "id" IN (%s, %s)\n'
+            "  AND \"name\" = 'a' LIMIT 10"
+        )
+        second = normalize_sql(
+            'SELECT "id" FROM "reviews_title" WHERE "id" IN (%s, %s, %s) '
+            "AND \"name\" = 'b' LIMIT 20"
+        )
+        assert first == second == (
+            'SELECT "id" FROM "reviews_title" WHERE "id" IN (...) '
+            'AND "name" = ? LIMIT ?'
+        ), (
+            'Проверьте, что запросы, отличающиеся только значениями, '
+            'получают одинаковый нормализованный SQL.'
+        )
+
+    def test_04_slow_query_log(self, admin_client, settings):
+        create_titles(admin_client)
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.CATALOG_CACHE_TIMEOUT = 0
+        client = Client()
+        for _ in range(2):
+            client.get('/api/v1/titles/')
+        entry = SlowQuery.objects.get(
+            normalized_sql__startswith='SELECT',
+            normalized_sql__contains='"reviews_title"',
+            normalized_sql__endswith='LIMIT ?',
+        )
+        assert entry.count == 2, (
+            'Проверьте, что одинаковые запросы суммируются в одной записи.'
+        )
+        assert entry.view == 'title-list'
+        assert entry.plan, (
+            'Проверьте, что для медленного запроса сохраняется план EXPLAIN.'
+        )
+        assert entry.max_time > 0 and entry.total_time >= entry.max_time
+        assert not SlowQuery.objects.filter(
+            normalized_sql__contains='monitoring_slowquery'
+        ).exists(), (
+            'Проверьте, что запросы самого журнала в него не попадают.'
+        )
+
+    def test_05_metrics_access(self, user_client, admin_client, settings):
+        anonymous = Client(REMOTE_ADDR='10.0.0.1')
+        response = anonymous.get('/metrics')
+        assert response.status_code == 401, (
+            'Проверьте, что /metrics недоступен анонимно с внешнего адреса.'
+        )
+        user_client.defaults['REMOTE_ADDR'] = '10.0.0.1'
+        assert user_client.get('/metrics').status_code == 403, (
+            'Проверьте, что /metrics недоступен обычному пользователю.'
+        )
+        admin_client.defaults['REMOTE_ADDR'] = '10.0.0.1'
+        assert admin_client.get('/metrics').status_code == 200, (
+            'Проверьте, что администратор получает метрики с любого адреса.'
+        )
+        assert Client().get('/metrics').status_code == 401, (
+            'Проверьте, что по умолчанию /metrics недоступен без токена '
+            'даже с localhost, откуда приходят запросы через прокси.'
+        )
+
+        settings.METRICS_TOKEN = 'секрет'
+        assert anonymous.get(
+            '/metrics', HTTP_X_METRICS_TOKEN='другой'
+        ).status_code == 401
+        response = anonymous.get('/metrics', HTTP_X_METRICS_TOKEN='секрет')
+        assert response.status_code == 200, (
+            'Проверьте, что /metrics доступен с токеном METRICS_TOKEN.'
+        )
+        assert response['Content-Type'].startswith(
+            'text/plain; version=0.0.4'
+        )
+        settings.METRICS_ALLOWED_IPS = ('10.0.0.2',)
+        assert Client(REMOTE_ADDR='10.0.0.2').get('/metrics').status_code == (
+            200
+        ), 'Проверьте, что /metrics доступен с адресов METRICS_ALLOWED_IPS.'
+
+    def test_06_metrics_counters(self, admin_client):
+        create_titles(admin_client)
+        requests_key = ('yamdb_http_requests_total', (
+            ('route', 'title-list'), ('method', 'GET'), ('status', 200)
+        ))
+        queries_key = ('yamdb_db_queries_total', (('route', 'title-list'),))
+        counters, _ = registry.snapshot()
+        before = counters.get(requests_key, 0), counters.get(queries_key, 0)
+        client = Client()
+        for _ in range(2):
+            client.get('/api/v1/titles/')
+        counters, histograms = registry.snapshot()
+        assert counters[requests_key] - before[0] == 2, (
+            'Проверьте, что запросы считаются по имени маршрута.'
+        )
+        assert counters[queries_key] - before[1] == 5, (
+            'Проверьте, что считаются запросы к БД; второй ответ на '
+            'список произведений берётся из кэша.'
+        )
+        assert (
+            'yamdb_http_request_duration_seconds',
+            (('route', 'title-list'),)
+        ) in histograms
+
+        text = admin_client.get('/metrics').content.decode()
+        for line in (
+            '# TYPE yamdb_http_request_duration_seconds histogram',
+            'yamdb_http_request_duration_seconds_bucket{route="title-list",'
+            'le="+Inf"}',
+            'yamdb_cache_requests_total{cache="catalog",result="hit"}',
+            'yamdb_cache_hit_ratio{cache="catalog"}',
+            'yamdb_email_outbox_depth 0',
+            'process_max_resident_memory_bytes',
+        ):
+            assert line in text, (
+                f'Проверьте, что метрики содержат строку `{line}`.'
+            )
+
+    def test_07_metrics_threads(self):
+        metrics = MetricsRegistry()
+
+        def work():
+            for _ in range(100):
+                metrics.inc('requests')
+            metrics.observe('duration', (), 0.3)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics.inc('requests')
+        counters, histograms = metrics.snapshot()
+        assert counters[('requests', ())] == 401, (
+            'Проверьте, что счётчики всех потоков суммируются.'
+        )
+        assert histograms[('duration', ())][-1] == pytest.approx(1.2)
+        assert len(metrics.shards) == 1, (
+            'Проверьте, что данные завершённых потоков сливаются в общие.'
+        )
+        assert metrics.snapshot()[0][('requests', ())] == 401
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews
+
+
+def rating_fields(title_id):
+    return Title.objects.values_list(
+        'score_sum', 'review_count'
+    ).get(pk=title_id)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Ratings:
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        assert rating_fields(title_id) == (10, 2)
+
+        review = Review.objects.get(pk=reviews[1]['id'])
+        review.score = 9
+        review.save()
+        assert rating_fields(title_id) == (14, 2), (
+            'Проверьте, что изменение оценки вне API сдвигает рейтинг.'
+        )
+
+        review = Review.objects.only('id').get(pk=reviews[1]['id'])
+        review.title_id = titles[1]['id']
+        review.save()
+        assert rating_fields(title_id) == (5, 1)
+        assert rating_fields(titles[1]['id']) == (9, 1), (
+            'Проверьте, что перенос отзыва переносит его оценку.'
+        )
+
+        Review.objects.filter(pk=reviews[0]['id']).delete()
+        assert rating_fields(title_id) == (0, 0), (
+            'Проверьте, что удаление отзыва, например из админки, '
+            'уменьшает рейтинг.'
+        )
+
+    def test_02_rating_after_author_deleted(self, admin_client, admin,
+                                            user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert rating_fields(title_id) == (5, 1), (
+            'Проверьте, что отзывы, удалённые вместе с автором, '
+            'не остаются в рейтинге произведения.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['rating'] == 5
+
+    def test_03_recalculate_ratings(self, admin_client, admin, user_client,
+                                    user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(score_sum=3, review_count=7)
+
+        out = StringIO()
+        call_command('recalculate_ratings', '--dry-run', stdout=out)
+        assert 'сумма 3 -> 10, отзывов 7 -> 2' in out.getvalue(), (
+            'Проверьте, что команда выводит найденные расхождения.'
+        )
+        assert 'изменения не сохранены' in out.getvalue()
+        assert rating_fields(title_id) == (3, 7), (
+            'Проверьте, что с --dry-run рейтинг не изменяется.'
+        )
+
+        out = StringIO()
+        call_command('recalculate_ratings', stdout=out)
+        assert 'Исправлено расхождений: 1' in out.getvalue()
+        assert rating_fields(title_id) == (10, 2)
+
+        out = StringIO()
+        call_command('recalculate_ratings', stdout=out)
+        assert 'Расхождений не найдено' in out.getvalue()
+
+    def test_04_rating_fields_backfill(self, admin_client, admin,
+                                       user_client, user):
+        create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        before = [('reviews', '0003_alter_review_score')]
+        after = [('reviews', '0004_title_rating_fields')]
+        executor = MigrationExecutor(connection)
+        executor.migrate(before)
+        try:
+            executor.loader.build_graph()
+            executor.migrate(after)
+            titles = MigrationExecutor(connection).loader.project_state(
+                after
+            ).apps.get_model('reviews', 'Title')
+            assert sorted(titles.objects.values_list(
+                'score_sum', 'review_count'
+            )) == [(0, 0), (10, 2)], (
+                'Проверьте, что миграция 0004 заполняет сумму оценок и '
+                'число отзывов по существующим отзывам.'
+            )
+        finally:
+            executor = MigrationExecutor(connection)
+            executor.migrate(executor.loader.graph.leaf_nodes())
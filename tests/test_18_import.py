@@ -0,0 +1,238 @@
+import csv
+import re
+import shutil
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.datasets import DATASETS
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+DATASET = {
+    'users.csv': [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        ('1', 'alice', 'alice@yamdb.fake', 'user', '', '', ''),
+        ('2', 'bob', 'bob@yamdb.fake', 'moderator', '', '', ''),
+    ],
+    'category.csv': [('id', 'name', 'slug'), ('1', 'Фильм', 'movie')],
+    'genre.csv': [('id', 'name', 'slug'), ('1', 'Драма', 'drama')],
+    'titles.csv': [
+        ('id', 'name', 'year', 'category_id', 'description'),
+        ('1', 'Матрица', '1999', '1', 'Описание'),
+        ('2', 'Брат', '1997', '1', ''),
+    ],
+    'review.csv': [
+        ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+        ('1', '1', 'Отлично', '1', '10', '2019-01-01T00:00:00Z'),
+        ('2', '1', 'Неплохо', '2', '7', '2021-01-01T00:00:00Z'),
+        ('3', '2', 'Хорошо', '1', '8', '2022-01-01T00:00:00Z'),
+    ],
+    'comments.csv': [
+        ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+        ('1', '1', 'Согласен', '2', '2020-01-01T00:00:00Z'),
+        ('2', '3', 'Спорно', '2', '2022-06-01T00:00:00Z'),
+    ],
+    'genre_title.csv': [
+        ('id', 'title_id', 'genre_id'), ('1', '1', '1'), ('2', '2', '1'),
+    ],
+}
+
+
+def write_dataset(data_dir, **changes):
+    """Пишет набор файлов; changes заменяет строки файла по имени."""
+    for filename, rows in DATASET.items():
+        rows = changes.get(filename.replace('.', '_'), rows)
+        with open(data_dir / filename, 'w', encoding='utf-8',
+                  newline='') as file:
+            csv.writer(file).writerows(rows)
+    return data_dir
+
+
+def run_import(data_dir, *args):
+    out, err = StringIO(), StringIO()
+    call_command(
+        'import', '--data-dir', str(data_dir), *args, stdout=out, stderr=err
+    )
+    return out.getvalue(), err.getvalue()
+
+
+def file_stats(output, filename):
+    line = next(
+        line for line in output.splitlines() if line.startswith(filename)
+    )
+    return {
+        name: int(value)
+        for name, value in re.findall(r'([а-я][а-я ]*): (\d+)', line)
+    }
+
+
+def snapshot():
+    return {
+        name: list(dataset.model.objects.order_by('pk').values_list(
+            *dataset.columns
+        ))
+        for name, dataset in DATASETS.items()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Import:
+
+    def test_01_data_dir_and_batch_size(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(Path(settings.BASE_DIR) / 'static' / 'data', data_dir)
+        output, _ = run_import(data_dir, '--batch-size', '7')
+        assert 'Данные успешно загружены' in output
+        expected = snapshot()
+        assert len(expected['titles']) == 32 and expected['reviews'], (
+            'Проверьте, что команда загружает файлы из --data-dir.'
+        )
+        assert Title.objects.filter(review_count__gt=0).count() == 32, (
+            'Проверьте, что после импорта пересчитывается рейтинг.'
+        )
+
+        for options in (('--batch-size', '0'), ('--workers', '0')):
+            with pytest.raises(CommandError):
+                run_import(data_dir, *options)
+        (data_dir / 'genre.csv').unlink()
+        with pytest.raises(CommandError, match='genre.csv'):
+            run_import(data_dir)
+
+    def test_02_workers_give_same_result(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(Path(settings.BASE_DIR) / 'static' / 'data', data_dir)
+        run_import(data_dir, '--workers', '2', '--batch-size', '10')
+        parallel = snapshot()
+        for model in (User, Title, Category, Genre):
+            model.objects.all().delete()
+        assert not Review.objects.exists()
+        run_import(data_dir, '--batch-size', '10')
+        assert snapshot() == parallel, (
+            'Проверьте, что импорт в несколько процессов загружает те же '
+            'данные, что и в один.'
+        )
+
+    def test_03_rollback_file_on_integrity_error(self, tmp_path):
+        titles = DATASET['titles.csv']
+        data_dir = write_dataset(tmp_path, titles_csv=[
+            *titles, ('3', 'Брат 2', '2000', '1', ''), titles[1]
+        ])
+        with pytest.raises(CommandError, match='titles.csv'):
+            run_import(data_dir, '--batch-size', '2')
+        assert not Title.objects.exists(), (
+            'Проверьте, что ошибка БД откатывает все пачки файла.'
+        )
+        assert Category.objects.count() == 1 and User.objects.count() == 2, (
+            'Проверьте, что файлы, загруженные до ошибки, сохраняются.'
+        )
+
+    def test_04_upsert_writes_only_changed_rows(self, tmp_path):
+        data_dir = write_dataset(tmp_path)
+        run_import(data_dir)
+        before = snapshot()
+        output, _ = run_import(data_dir, '--upsert')
+        assert snapshot() == before
+        for filename in ('users.csv', 'titles.csv', 'review.csv'):
+            assert file_stats(output, filename)['обновлено'] == 0, (
+                'Проверьте, что повторный импорт с --upsert ничего '
+                'не изменяет.'
+            )
+
+        reviews = DATASET['review.csv']
+        changed = (*reviews[2][:2], 'Уже не так неплохо', *reviews[2][3:])
+        write_dataset(tmp_path, review_csv=[
+            *reviews[:2], changed, *reviews[3:],
+            ('4', '2', 'Новый', '2', '6', '2023-01-01T00:00:00Z'),
+        ])
+        with CaptureQueriesContext(connection) as context:
+            output, _ = run_import(data_dir, '--upsert')
+        assert file_stats(output, 'review.csv') == {
+            'без изменений': 2, 'обновлено': 1, 'создано': 1
+        }
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_review"')
+        ]
+        assert len(updates) == 1 and '"reviews_review"."id" IN (2)' in (
+            updates[0]
+        ), 'Проверьте, что --upsert записывает только изменившиеся строки.'
+        assert Review.objects.get(pk=2).text == 'Уже не так неплохо'
+        assert Title.objects.get(pk=2).review_count == 2
+
+    def test_05_since(self, tmp_path):
+        data_dir = write_dataset(tmp_path)
+        run_import(data_dir)
+        reviews, comments = DATASET['review.csv'], DATASET['comments.csv']
+        write_dataset(
+            tmp_path,
+            review_csv=[reviews[0], *(
+                (*row[:2], f'{row[2]}!', *row[3:]) for row in reviews[1:]
+            )],
+            comments_csv=[comments[0], *(
+                (*row[:2], f'{row[2]}!', *row[3:]) for row in comments[1:]
+            )],
+        )
+        output, _ = run_import(
+            data_dir, '--upsert', '--since', '2021-06-01'
+        )
+        assert dict(Review.objects.values_list('pk', 'text')) == {
+            1: 'Отлично', 2: 'Неплохо', 3: 'Хорошо!'
+        }
+        assert dict(Comment.objects.values_list('pk', 'text')) == {
+            1: 'Согласен', 2: 'Спорно!'
+        }, (
+            'Проверьте, что --since пропускает отзывы и комментарии, '
+            'опубликованные раньше указанного момента.'
+        )
+        assert file_stats(output, 'review.csv')['пропущено'] == 2
+        assert file_stats(output, 'comments.csv')['пропущено'] == 1
+        with pytest.raises(CommandError):
+            run_import(data_dir, '--since', 'вчера')
+
+    def test_06_error_report(self, tmp_path):
+        data_dir = write_dataset(
+            tmp_path,
+            titles_csv=[
+                *DATASET['titles.csv'], ('3', 'Без года', 'abc', '1', ''),
+            ],
+            review_csv=[
+                *DATASET['review.csv'],
+                ('4', '1', 'Слишком', '2', '11', '2023-01-01T00:00:00Z'),
+                ('5', '99', 'Не туда', '2', '5', '2023-01-01T00:00:00Z'),
+            ],
+        )
+        report = tmp_path / 'errors.csv'
+        output, errors = run_import(data_dir, '--error-report', str(report))
+        assert 'пропущено строк с ошибками: 3' in output
+        with open(report, encoding='utf-8', newline='') as file:
+            rows = list(csv.reader(file))
+        assert rows[0] == ['file', 'line', 'error']
+        assert [row[:2] for row in rows[1:]] == [
+            ['titles.csv', '4'], ['review.csv', '5'], ['review.csv', '6'],
+        ], 'Проверьте, что отчёт содержит файл и строку каждой ошибки.'
+        assert 'year' in rows[1][2] and 'score' in rows[2][2]
+        assert 'title_id=99' in rows[3][2]
+        assert 'titles.csv, строка 4' in errors
+        assert Title.objects.count() == 2 and Review.objects.count() == 3, (
+            'Проверьте, что ошибочные строки пропускаются, а остальные '
+            'загружаются.'
+        )
+
+    def test_07_import_resets_catalog_cache(self, tmp_path, client):
+        data_dir = write_dataset(tmp_path)
+        run_import(data_dir)
+        assert client.get('/api/v1/categories/').json()['count'] == 1
+        write_dataset(tmp_path, category_csv=[
+            *DATASET['category.csv'], ('2', 'Книга', 'book'),
+        ])
+        run_import(data_dir, '--upsert')
+        assert client.get('/api/v1/categories/').json()['count'] == 2, (
+            'Проверьте, что после импорта кэш ответов каталога сбрасывается.'
+        )